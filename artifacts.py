@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""ساخت فایل‌های انتشار برای مصرف‌کنندگان: نسخه‌های پیش‌فشرده و فایل تغییرات روزانه.
+
+- برای هر فایل خروجی نسخه gzip و (در صورت نصب بودن zstandard) zstd ساخته
+  می‌شود؛ فشرده‌سازی قالب‌ها و فایل‌ها به صورت موازی انجام می‌شود.
+- فایل تغییرات (delta) شامل ردیف‌های اضافه‌شده از آخرین انتشار و هش
+  sha256 نسخه پایه CSV است تا کلاینت‌ها بتوانند به صورت افزایشی همگام شوند.
+  اطلاعات آخرین انتشار در USD2Rials.release.json نگه‌داری می‌شود.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from csv_store import FIELDNAMES, CSVStore
+
+GZIP_LEVEL = 9
+ZSTD_LEVEL = 19
+EXTENSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+
+
+def _zstandard():
+    """ماژول zstandard یا None (zstandard اختیاری است و فقط هنگام نیاز بارگذاری می‌شود)"""
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def available_formats() -> list:
+    return ['gzip', 'zstd'] if _zstandard() is not None else ['gzip']
+
+
+def file_sha256(path, size=None) -> str:
+    """هش sha256 کل فایل یا `size` بایت ابتدای آن"""
+    h = hashlib.sha256()
+    remaining = os.path.getsize(path) if size is None else size
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            chunk = f.read(min(1 << 20, remaining))
+            if not chunk:
+                break
+            h.update(chunk)
+            remaining -= len(chunk)
+    return h.hexdigest()
+
+
+def _compress(path, fmt, out_dir) -> str:
+    out_path = os.path.join(out_dir, os.path.basename(path) + EXTENSIONS[fmt])
+    with open(path, 'rb') as f:
+        data = f.read()
+    if fmt == 'gzip':
+        # mtime=0 تا خروجی برای ورودی یکسان همیشه یکسان باشد
+        compressed = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    else:
+        compressed = _zstandard().ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(compressed)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def build_compressed(paths, out_dir="dist", formats=None, max_workers=None) -> list:
+    """ساخت موازی نسخه‌های فشرده همه فایل‌ها در همه قالب‌ها؛ برمی‌گرداند: مسیر فایل‌های ساخته‌شده"""
+    formats = formats or available_formats()
+    if 'zstd' in formats and _zstandard() is None:
+        print("⚠️ بسته zstandard نصب نیست - نسخه zstd ساخته نمی‌شود")
+        formats = [fmt for fmt in formats if fmt != 'zstd']
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(path, fmt) for path in paths if os.path.exists(path) for fmt in formats]
+    with ThreadPoolExecutor(max_workers=max_workers or max(1, min(len(jobs), os.cpu_count() or 1))) as pool:
+        return list(pool.map(lambda job: _compress(job[0], job[1], out_dir), jobs))
+
+
+class ReleaseState:
+    """اطلاعات CSV در زمان آخرین انتشار (پایه فایل تغییرات)"""
+
+    def __init__(self, path="USD2Rials.release.json"):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, tag, csv_file_path, row_count) -> None:
+        state = {
+            'tag': tag,
+            'csv_size': os.path.getsize(csv_file_path),
+            'csv_sha256': file_sha256(csv_file_path),
+            'row_count': row_count,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def build_delta(csv_file_path, release_state: ReleaseState, out_path, tag=None) -> dict:
+    """فایل تغییرات نسبت به آخرین انتشار را می‌سازد.
+    اگر CSV خارج از انتهای خود تغییر کرده باشد (یا انتشار قبلی ثبت نشده باشد)،
+    full_sync_required برابر true و rows خالی است.
+    """
+    store = CSVStore(csv_file_path)
+    base = release_state.load()
+    delta = {
+        'fields': FIELDNAMES,
+        'tag': tag,
+        'base_tag': base['tag'] if base else None,
+        'base_rows': base['row_count'] if base else 0,
+        'base_sha256': base['csv_sha256'] if base else None,
+        'target_rows': store.row_count(),
+        'target_sha256': file_sha256(csv_file_path),
+        'full_sync_required': True,
+        'rows': [],
+    }
+    if (base and os.path.getsize(csv_file_path) >= base['csv_size']
+            and file_sha256(csv_file_path, base['csv_size']) == base['csv_sha256']):
+        delta['full_sync_required'] = False
+        delta['rows'] = [[row[name] for name in FIELDNAMES] for row in store.iter_rows(base['row_count'])]
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(delta, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, out_path)
+    return delta
+
+
+def build_release_artifacts(csv_file_path, files, release_state: ReleaseState, out_dir="dist", tag=None,
+                            delta_name="USD2Rials.delta.json") -> list:
+    """ساخت همه فایل‌های انتشار: delta و نسخه‌های فشرده. برمی‌گرداند: مسیر فایل‌ها"""
+    os.makedirs(out_dir, exist_ok=True)
+    delta_path = os.path.join(out_dir, delta_name)
+    delta = build_delta(csv_file_path, release_state, delta_path, tag)
+    if delta['full_sync_required']:
+        print("ℹ️ فایل تغییرات: همگام‌سازی کامل لازم است (نسخه پایه معتبر نیست)")
+    else:
+        print(f"✅ فایل تغییرات با {len(delta['rows'])} ردیف نسبت به {delta['base_tag']} ساخته شد")
+    return [delta_path] + build_compressed(list(files), out_dir)
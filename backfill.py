@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""بازیابی روزهای از دست رفته از صفحات جدول تاریخچه tgju.
+
+صفحات به صورت هم‌زمان (با تعداد محدود نخ) و روی یک Session مشترک دریافت
+می‌شوند و تمام ردیف‌های جدید در یک نوشتن واحد با ترتیب تاریخ در CSV ادغام
+می‌شوند. با `page_url_template` می‌توان آن را روی یک سرور محلی که صفحات
+ذخیره‌شده (مثلاً fixtures/tgju) را سرو می‌کند اجرا کرد:
+
+    python -m http.server -d fixtures/tgju 8000
+    python update_price.py backfill --page-url-template "http://127.0.0.1:8000/history_page{page}.html"
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import dates
+from http_cache import make_session
+
+
+class HistoryBackfiller:
+    def __init__(self, updater, page_url_template=None, max_workers=4, retries=3,
+                 backoff_factor=0.5, timeout=30):
+        self.updater = updater
+        self.page_url_template = page_url_template or f"{updater.url}?page={{page}}"
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.session = make_session(max_workers, retries, backoff_factor, headers=updater.headers)
+
+    def fetch_page(self, page: int) -> list:
+        """ردیف‌های یک صفحه از جدول تاریخچه؛ در صورت خطا (پس از تلاش‌های مجدد) None"""
+        url = self.page_url_template.format(page=page)
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            return self.updater.parse_history_rows(response.content)
+        except Exception as e:
+            print(f"⚠️ خطا در دریافت صفحه {page}: {e}")
+            return None
+
+    def fetch_pages(self, max_pages: int = 10, since: str = None) -> list:
+        """صفحات را به صورت دسته‌ای و هم‌زمان دریافت می‌کند.
+        پیمایش با رسیدن به صفحه خالی، ردیف قدیمی‌تر از `since` (تاریخ شمسی) یا `max_pages` متوقف می‌شود.
+        """
+        since_key = dates.parse_jalali(since) if since else None
+        rows = []
+        failed = []
+        page = 1
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while page <= max_pages:
+                batch = list(range(page, min(page + self.max_workers, max_pages + 1)))
+                results = list(pool.map(self.fetch_page, batch))
+                page += len(batch)
+                done = False
+                for page_number, page_rows in zip(batch, results):
+                    if page_rows is None:
+                        failed.append(page_number)
+                        continue
+                    if not page_rows:
+                        done = True
+                        break
+                    rows.extend(page_rows)
+                    oldest = min(filter(None, (dates.parse_jalali(r['date_pr']) for r in page_rows)), default=None)
+                    if since_key and oldest and oldest < since_key:
+                        done = True
+                        break
+                if done:
+                    break
+        if failed:
+            print(f"⚠️ صفحات دریافت‌نشده: {', '.join(map(str, failed))}")
+        if since_key:
+            rows = [r for r in rows if (dates.parse_jalali(r['date_pr']) or since_key) >= since_key]
+        return rows
+
+    def merge_into_csv(self, rows) -> int:
+        """ردیف‌های جدید را (بدون تکرار تاریخ) با ترتیب تاریخ و در یک نوشتن اتمیک در CSV ادغام می‌کند.
+        ردیف‌های موجود در CSV بر ردیف‌های دریافتی اولویت دارند. برمی‌گرداند: تعداد ردیف‌های اضافه‌شده
+        """
+        index = self.updater.get_date_index()
+        added = sum(1 for row in rows if index.add(row))
+        if not added:
+            return 0
+        index.write_csv(self.updater.csv_file_path)
+        self.updater.store.rebuild_index()
+        return added
+
+    def run(self, max_pages: int = 10, since: str = None) -> bool:
+        """اجرای کامل بازیابی: دریافت صفحات، ادغام در CSV و به‌روزرسانی JSON ها"""
+        print(f"🔄 شروع بازیابی تاریخچه (حداکثر {max_pages} صفحه، {self.max_workers} اتصال هم‌زمان)...")
+        started = time.monotonic()
+        try:
+            rows = self.fetch_pages(max_pages=max_pages, since=since)
+            print(f"📥 {len(rows)} ردیف در {time.monotonic() - started:.2f} ثانیه دریافت شد")
+            added = self.merge_into_csv(rows)
+            if not added:
+                print("ℹ️ روز جدیدی برای اضافه کردن پیدا نشد")
+                return True
+            print(f"✅ {added} روز از دست رفته به فایل CSV اضافه شد")
+            json_success, _ = self.updater.update_json_files()
+            return json_success
+        except Exception as e:
+            print(f"❌ خطا در بازیابی تاریخچه: {e}")
+            return False
+        finally:
+            self.session.close()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""مقایسه سرعت روش‌های تجزیه جدول تاریخچه روی صفحات ذخیره‌شده tgju.
+
+    python benchmarks/bench_parsers.py
+    python benchmarks/bench_parsers.py --repeat 50 fixtures/tgju/history_full_page.html
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from history_parser import PARSERS, extract_history_cells  # noqa: E402
+
+BACKENDS = [name for name in PARSERS if name != 'auto']
+
+
+def bench_file(path, repeat, limit=None):
+    with open(path, 'rb') as f:
+        content = f.read()
+    results = {}
+    reference = None
+    for backend in BACKENDS:
+        cells = extract_history_cells(content, backend, limit)
+        if reference is None:
+            reference = cells
+        elif cells != reference:
+            raise AssertionError(f"خروجی {backend} با {BACKENDS[0]} برای {path} یکسان نیست")
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            extract_history_cells(content, backend, limit)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        results[backend] = timings[len(timings) // 2]
+    return len(content), len(reference), results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="بنچمارک تجزیه‌گرهای صفحه تاریخچه tgju")
+    parser.add_argument('files', nargs='*', help="فایل‌های HTML (پیش‌فرض: fixtures/tgju/*.html)")
+    parser.add_argument('--repeat', type=int, default=20, help="تعداد تکرار برای هر تجزیه‌گر")
+    parser.add_argument('--limit', type=int, help="حداکثر تعداد ردیف (مانند fetch_latest_price با 1)")
+    args = parser.parse_args(argv)
+
+    files = args.files or sorted(glob.glob(os.path.join(ROOT, 'fixtures', 'tgju', '*.html')))
+    print(f"{'file':<28}{'bytes':>9}{'rows':>6}" + ''.join(f"{name:>20}" for name in BACKENDS))
+    for path in files:
+        size, rows, results = bench_file(path, args.repeat, args.limit)
+        baseline = results['html.parser']
+        line = f"{os.path.basename(path):<28}{size:>9,}{rows:>6}"
+        for name in BACKENDS:
+            line += f"{results[name] * 1000:>10.2f}ms ({baseline / results[name]:4.1f}x)"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
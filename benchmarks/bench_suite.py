@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""مجموعه بنچمارک مسیرهای اصلی به‌روزرسانی روی CSV مصنوعی و صفحات ذخیره‌شده tgju.
+
+موارد اندازه‌گیری‌شده برای هر اندازه CSV (پیش‌فرض 10k، 100k، 1M و 10M ردیف):
+    normalize_gregorian_date / to_iso_date : ستون تاریخ کامل، با کش سرد و گرم
+    regenerate_json_files                  : تولید کامل JSON و فایل باینری
+    get_last_entry                         : خواندن آخرین ردیف از انتهای فایل
+    get_csv_row_count                      : با ایندکس ذخیره‌شده و بدون ایندکس
+و مستقل از اندازه: fetch_latest_price روی هر صفحه fixtures/tgju با هر تجزیه‌گر.
+
+نتایج در یک فایل JSON نوشته می‌شوند؛ با --compare نتیجه با یک baseline ذخیره‌شده
+مقایسه و در صورت کندتر شدن بیش از --threshold با کد 1 خارج می‌شود.
+
+    python benchmarks/bench_suite.py --sizes 10k,100k
+    python benchmarks/bench_suite.py --save-baseline
+    python benchmarks/bench_suite.py --compare
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import dates  # noqa: E402
+from history_parser import PARSERS  # noqa: E402
+from synthetic import format_size, parse_size, synthetic_csv  # noqa: E402
+from update_price import USD2RialsUpdater  # noqa: E402
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = '10k,100k,1M,10M'
+DEFAULT_OUTPUT = os.path.join(ROOT, 'benchmarks', 'results', 'latest.json')
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'results', 'baseline.json')
+FIXTURES = os.path.join(ROOT, 'fixtures', 'tgju')
+
+
+class _FixtureAdapter(requests.adapters.BaseAdapter):
+    """پاسخ به همه درخواست‌ها با محتوای یک صفحه ذخیره‌شده (بدون شبکه)"""
+
+    def __init__(self, content):
+        super().__init__()
+        self.content = content
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.content
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def measure(func, repeat, min_time=0.0):
+    """اجرای func حداقل یک بار و حداکثر `repeat` بار (یا تا رسیدن به min_time ثانیه).
+    برمی‌گرداند: لیست زمان‌ها به ثانیه
+    """
+    timings = []
+    total = 0.0
+    while len(timings) < repeat or total < min_time:
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        timings.append(elapsed)
+        total += elapsed
+        if len(timings) >= max(repeat, 1) * 10:
+            break
+    return timings
+
+
+def _result(name, variant, rows, timings, ops=None):
+    timings = sorted(timings)
+    median = timings[len(timings) // 2]
+    result = {
+        'name': name,
+        'variant': variant,
+        'rows': rows,
+        'repeat': len(timings),
+        'median': median,
+        'min': timings[0],
+        'max': timings[-1],
+    }
+    if ops:
+        result['ops'] = ops
+        result['ns_per_op'] = median / ops * 1e9
+    return result
+
+
+def _key(result) -> str:
+    return f"{result['name']}[{result['variant']}]@{result['rows']}"
+
+
+def bench_size(rows, repeat, workdir):
+    """همه موارد وابسته به اندازه روی یک CSV مصنوعی"""
+    source = synthetic_csv(rows)
+    csv_path = os.path.join(workdir, 'USD2Rials.csv')
+    shutil.copyfile(source, csv_path)
+    updater = USD2RialsUpdater(csv_file_path=csv_path,
+                               json_state_path=os.path.join(workdir, 'USD2Rials.state.json'),
+                               http_cache_dir=None)
+    # برای اندازه‌های بزرگ یک اجرا کافی است
+    heavy_repeat = repeat if rows <= 100_000 else 1
+    results = []
+
+    # ستون تاریخ میلادی به شکل خام سایت (Y/M/D) و به شکل CSV (M/D/Y)
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        f.readline()
+        column = [line.split(',', 2)[1] for line in f]
+    raw_column = []
+    for value in column:
+        m, d, y = value.split('/')
+        raw_column.append(f"{y}/{int(m):02d}/{int(d):02d}")
+
+    def run_column(func, values, clear):
+        def run():
+            if clear:
+                func.cache_clear()
+            for value in values:
+                func(value)
+        return run
+
+    for name, func, values in (('normalize_gregorian_date', dates.normalize_gregorian_date, raw_column),
+                               ('to_iso_date', dates.to_iso_date, column)):
+        for variant, clear in (('cold', True), ('warm', False)):
+            results.append(_result(name, variant, rows,
+                                   measure(run_column(func, values, clear), heavy_repeat), len(values)))
+    del column, raw_column
+
+    json_paths = [os.path.join(workdir, name) for name in ('USD2Rials.json', 'USD2Rials.min.json', 'USD2Rials.bin')]
+    results.append(_result('regenerate_json_files', 'full', rows,
+                           measure(lambda: updater.regenerate_json_files(*json_paths), heavy_repeat), rows))
+
+    results.append(_result('get_last_entry', 'tail', rows, measure(updater.get_last_entry, repeat, 0.1)))
+
+    def row_count_cold():
+        if os.path.exists(updater.store.index_path):
+            os.remove(updater.store.index_path)
+        updater.store._index = None
+        updater.get_csv_row_count()
+
+    def row_count_indexed():
+        updater.store._index = None
+        updater.get_csv_row_count()
+
+    results.append(_result('get_csv_row_count', 'no_index', rows, measure(row_count_cold, heavy_repeat), rows))
+    results.append(_result('get_csv_row_count', 'indexed', rows, measure(row_count_indexed, repeat, 0.1)))
+    return results
+
+
+def bench_fetch(repeat):
+    """fetch_latest_price روی صفحات ذخیره‌شده با هر تجزیه‌گر (کش HTTP غیرفعال)"""
+    results = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, '*.html'))):
+        with open(path, 'rb') as f:
+            content = f.read()
+        for parser in PARSERS:
+            updater = USD2RialsUpdater(parser=parser, http_cache_dir=None)
+            updater.session.mount('https://', _FixtureAdapter(content))
+            if updater.fetch_latest_price() is None:
+                # صفحه بدون ردیف (مثلاً آخرین صفحه تاریخچه) معیار معناداری ندارد
+                break
+            results.append(_result('fetch_latest_price', f"{parser}:{os.path.basename(path)}", len(content),
+                                   measure(updater.fetch_latest_price, repeat, 0.1)))
+    return results
+
+
+def scaling(results):
+    """نمای مقیاس‌پذیری: توان تقریبی رشد زمان بین اندازه‌های متوالی (1 یعنی خطی)"""
+    curves = {}
+    for result in results:
+        if result['name'] == 'fetch_latest_price':
+            continue
+        curves.setdefault(f"{result['name']}[{result['variant']}]", []).append((result['rows'], result['median']))
+    out = {}
+    for key, points in curves.items():
+        points.sort()
+        out[key] = [
+            {'from': n1, 'to': n2, 'exponent': math.log(t2 / t1) / math.log(n2 / n1) if t1 > 0 and t2 > 0 else None}
+            for (n1, t1), (n2, t2) in zip(points, points[1:])
+        ]
+    return out
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes, repeat, include_fetch=True):
+    results = []
+    for rows in sizes:
+        workdir = tempfile.mkdtemp(prefix=f"u2r-bench-{format_size(rows)}-")
+        try:
+            started = time.perf_counter()
+            results += bench_size(rows, repeat, workdir)
+            print(f"✅ اندازه {format_size(rows)} در {time.perf_counter() - started:.1f} ثانیه", file=sys.stderr)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    if include_fetch:
+        results += bench_fetch(repeat)
+    return {
+        'version': RESULTS_VERSION,
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'sizes': sizes,
+            'repeat': repeat,
+        },
+        'results': results,
+        'scaling': scaling(results),
+    }
+
+
+def compare(current, baseline, threshold):
+    """مقایسه میانه زمان‌ها با baseline؛ برمی‌گرداند: (سطرهای گزارش, تعداد پسرفت‌ها)"""
+    base = {_key(result): result for result in baseline['results']}
+    lines = []
+    regressions = 0
+    for result in current['results']:
+        previous = base.get(_key(result))
+        if previous is None:
+            lines.append(f"  {_key(result):<60} {'جدید':>10}")
+            continue
+        ratio = result['median'] / previous['median'] if previous['median'] else float('inf')
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  ❌ پسرفت'
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = '  ✅ بهبود'
+        lines.append(f"  {_key(result):<60} {previous['median'] * 1000:>10.3f}ms -> "
+                     f"{result['median'] * 1000:>10.3f}ms ({ratio:5.2f}x){flag}")
+    return lines, regressions
+
+
+def print_table(report):
+    print(f"{'benchmark':<56}{'rows':>10}{'median':>14}{'ns/op':>12}")
+    for result in report['results']:
+        ns = f"{result['ns_per_op']:>12.1f}" if 'ns_per_op' in result else f"{'':>12}"
+        print(f"{result['name'] + '[' + result['variant'] + ']':<56}{result['rows']:>10,}"
+              f"{result['median'] * 1000:>12.3f}ms{ns}")
+    for key, steps in report['scaling'].items():
+        curve = ', '.join(f"{format_size(step['from'])}->{format_size(step['to'])}: {step['exponent']:.2f}"
+                          for step in steps if step['exponent'] is not None)
+        if curve:
+            print(f"  scaling {key}: {curve}")
+
+
+def _write_json(path, data) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="مجموعه بنچمارک به‌روزرسانی قیمت روی داده مصنوعی")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f"اندازه‌های CSV جدا شده با کاما (پیش‌فرض {DEFAULT_SIZES})")
+    parser.add_argument('--repeat', type=int, default=5, help="تعداد تکرار هر مورد (اندازه‌های بالای 100k یک بار)")
+    parser.add_argument('--no-fetch', action='store_true', help="بدون بنچمارک fetch_latest_price روی fixtures")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="مسیر فایل نتایج JSON")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="مسیر baseline برای مقایسه یا ذخیره")
+    parser.add_argument('--save-baseline', action='store_true', help="ذخیره نتایج این اجرا به عنوان baseline")
+    parser.add_argument('--compare', action='store_true', help="مقایسه با baseline و خروج با کد 1 در صورت پسرفت")
+    parser.add_argument('--threshold', type=float, default=0.25, help="حد مجاز کندتر شدن نسبت به baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    report = run_suite(sizes, args.repeat, include_fetch=not args.no_fetch)
+    print_table(report)
+    _write_json(args.output, report)
+    print(f"📄 نتایج در {args.output} ذخیره شد")
+    if args.save_baseline:
+        _write_json(args.baseline, report)
+        print(f"📌 baseline در {args.baseline} ذخیره شد")
+
+    if args.compare:
+        try:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ baseline قابل خواندن نیست: {e}")
+            return 1
+        lines, regressions = compare(report, baseline, args.threshold)
+        print(f"مقایسه با baseline ({baseline['meta'].get('commit')}, {baseline['meta'].get('timestamp')}):")
+        print('\n'.join(lines))
+        if regressions:
+            print(f"❌ {regressions} مورد بیش از {args.threshold:.0%} کندتر شده است")
+            return 1
+        print("✅ پسرفتی دیده نشد")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""تولید CSV مصنوعی با ساختار USD2Rials.csv برای بنچمارک در مقیاس بزرگ.
+
+تاریخ‌ها از 1360/07/07 (مانند داده واقعی) روزبه‌روز جلو می‌روند؛ اگر تعداد
+ردیف‌ها از روزهای قابل نمایش بیشتر باشد، هر روز چند ردیف (مانند داده‌های
+درون‌روزی) می‌گیرد. قیمت‌ها یک گام تصادفی محدود با seed ثابت هستند و حدود یک سوم
+آن‌ها (مانند داده واقعی) اعشاری‌اند.
+
+    python benchmarks/synthetic.py 1M
+    python benchmarks/synthetic.py 10k --output /tmp/10k.csv
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import dates  # noqa: E402
+from csv_store import FIELDNAMES  # noqa: E402
+
+DATA_DIR = os.path.join(ROOT, 'benchmarks', '.data')
+START = date(1981, 9, 29)
+SOURCES = ('bourseview', 'tgju')
+_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+
+def parse_size(text: str) -> int:
+    """'10k'، '1M' یا عدد ساده را به تعداد ردیف تبدیل می‌کند"""
+    text = text.strip().lower().replace('_', '')
+    if text and text[-1] in _SUFFIXES:
+        return int(float(text[:-1]) * _SUFFIXES[text[-1]])
+    return int(text)
+
+
+def format_size(rows: int) -> str:
+    for suffix, factor in (('M', 1_000_000), ('k', 1_000)):
+        if rows >= factor and rows % factor == 0:
+            return f"{rows // factor}{suffix}"
+    return str(rows)
+
+
+def iter_rows(rows: int, seed: int = 0):
+    """ردیف‌های مصنوعی به صورت لیست [date_pr, date_gr, source, price_avg]"""
+    rng = random.Random(seed)
+    per_day = max(1, math.ceil(rows / (date.max - START).days))
+    price = 270.0
+    day = START
+    jalali = dates.gregorian_to_jalali(day.year, day.month, day.day)
+    for i in range(rows):
+        if i and i % per_day == 0:
+            day += timedelta(days=1)
+            jalali = dates.gregorian_to_jalali(day.year, day.month, day.day)
+        # گام تصادفی محدود تا قیمت در بازه int64 و شبیه داده واقعی بماند
+        price = min(max(price * (1 + rng.gauss(0.0003, 0.01)), 100.0), 10_000_000.0)
+        price_avg = f"{price:.2f}" if rng.random() < 0.33 else str(int(price))
+        yield [dates.format_jalali(*jalali), f"{day.month}/{day.day}/{day.year}",
+               SOURCES[day.year >= 2019], price_avg]
+
+
+def write_csv(path, rows: int, seed: int = 0) -> str:
+    """نوشتن CSV مصنوعی به صورت اتمیک؛ برمی‌گرداند: مسیر فایل"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(','.join(FIELDNAMES) + '\n')
+        batch = []
+        for row in iter_rows(rows, seed):
+            batch.append(','.join(row))
+            if len(batch) >= 65536:
+                f.write('\n'.join(batch) + '\n')
+                batch.clear()
+        if batch:
+            f.write('\n'.join(batch) + '\n')
+    os.replace(tmp_path, path)
+    return path
+
+
+def synthetic_csv(rows: int, seed: int = 0, data_dir=DATA_DIR) -> str:
+    """مسیر CSV مصنوعی با `rows` ردیف؛ فایل فقط بار اول ساخته و سپس دوباره استفاده می‌شود"""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"synthetic-{format_size(rows)}-s{seed}.csv")
+    if not os.path.exists(path):
+        print(f"⏳ ساخت CSV مصنوعی با {rows:,} ردیف: {path}", file=sys.stderr)
+        write_csv(path, rows, seed)
+    return path
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="تولید CSV مصنوعی قیمت برای بنچمارک")
+    parser.add_argument('size', help="تعداد ردیف (مثلاً 10k، 1M یا 10M)")
+    parser.add_argument('--seed', type=int, default=0, help="seed گام تصادفی قیمت")
+    parser.add_argument('--output', help="مسیر خروجی (پیش‌فرض: benchmarks/.data)")
+    args = parser.parse_args(argv)
+
+    rows = parse_size(args.size)
+    if args.output:
+        print(write_csv(args.output, rows, args.seed))
+    else:
+        print(synthetic_csv(rows, args.seed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
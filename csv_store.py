@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import csv
+import io
+import json
+import os
+
+FIELDNAMES = ['date_pr', 'date_gr', 'source', 'price_avg']
+
+
+class CSVStore:
+    """لایه ذخیره‌سازی CSV با ایندکس پایدار.
+
+    ایندکس در یک فایل جانبی (پیش‌فرض: `<csv>.idx`) نگه‌داری می‌شود و شامل
+    تعداد ردیف‌ها، اندازه فایل، آخرین خط و آفست بایتی هر `checkpoint_every`
+    ردیف است. آخرین ردیف با خواندن از انتهای فایل به دست می‌آید.
+    """
+
+    INDEX_VERSION = 1
+
+    def __init__(self, csv_file_path="USD2Rials.csv", index_path=None, checkpoint_every=1024):
+        self.csv_file_path = csv_file_path
+        self.index_path = index_path or f"{csv_file_path}.idx"
+        self.checkpoint_every = checkpoint_every
+        self._index = None
+
+    # --- خواندن انتهای فایل ---
+    def _read_last_line(self, block_size=4096):
+        """آخرین خط غیرخالی فایل را با جستجوی معکوس از انتهای فایل برمی‌گرداند: (آفست, بایت‌ها)"""
+        with open(self.csv_file_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            # نادیده گرفتن خط‌های خالی انتهایی
+            while end > 0:
+                f.seek(end - 1)
+                if f.read(1) not in (b'\n', b'\r'):
+                    break
+                end -= 1
+            pos = end
+            buf = b''
+            while pos > 0:
+                step = min(block_size, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step) + buf
+                nl = buf.rfind(b'\n')
+                if nl != -1:
+                    return pos + nl + 1, buf[nl + 1:]
+            return 0, buf
+
+    def _parse_line(self, line: bytes):
+        """یک خط CSV را به دیکشنری تبدیل می‌کند"""
+        values = next(csv.reader([line.decode('utf-8').rstrip('\r\n')]), None)
+        if not values:
+            return None
+        return dict(zip(FIELDNAMES, values))
+
+    # --- ایندکس ---
+    def _write_index(self, index) -> None:
+        """ایندکس را به صورت اتمیک (فایل موقت + جایگزینی) ذخیره می‌کند"""
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+        self._index = index
+
+    def rebuild_index(self):
+        """ایندکس را با یک بار پیمایش کامل فایل از نو می‌سازد"""
+        checkpoints = []
+        row_count = 0
+        last_offset = 0
+        with open(self.csv_file_path, 'rb') as f:
+            f.readline()  # رد کردن هدر
+            offset = f.tell()
+            for line in iter(f.readline, b''):
+                if line.strip():
+                    if row_count % self.checkpoint_every == 0:
+                        checkpoints.append(offset)
+                    last_offset = offset
+                    row_count += 1
+                offset += len(line)
+        _, last_line = self._read_last_line() if row_count else (0, b'')
+        index = {
+            'version': self.INDEX_VERSION,
+            'checkpoint_every': self.checkpoint_every,
+            'size': os.path.getsize(self.csv_file_path),
+            'row_count': row_count,
+            'last_offset': last_offset,
+            'last_line': last_line.decode('utf-8'),
+            'checkpoints': checkpoints,
+        }
+        self._write_index(index)
+        return index
+
+    def load_index(self):
+        """ایندکس معتبر را برمی‌گرداند؛ در صورت ناهماهنگی با فایل CSV آن را بازسازی می‌کند"""
+        if not os.path.exists(self.csv_file_path):
+            return None
+        size = os.path.getsize(self.csv_file_path)
+        index = self._index
+        if index is None:
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = None
+        if (not index or index.get('version') != self.INDEX_VERSION
+                or index.get('checkpoint_every') != self.checkpoint_every
+                or index['size'] != size or not self._last_line_matches(index)):
+            index = self.rebuild_index()
+        self._index = index
+        return index
+
+    def _last_line_matches(self, index) -> bool:
+        if not index['row_count']:
+            return True
+        offset, line = self._read_last_line()
+        return offset == index['last_offset'] and line.decode('utf-8') == index['last_line']
+
+    # --- API عمومی ---
+    def row_count(self) -> int:
+        """تعداد ردیف‌های داده (بدون هدر)"""
+        index = self.load_index()
+        return index['row_count'] if index else 0
+
+    def last_entry(self):
+        """آخرین ردیف فایل بدون خواندن کل فایل"""
+        if not os.path.exists(self.csv_file_path):
+            return None
+        offset, line = self._read_last_line()
+        if offset == 0:
+            # فایل فقط هدر دارد
+            return None
+        return self._parse_line(line)
+
+    def iter_rows(self, start_row: int = 0):
+        """ردیف‌ها را از شماره `start_row` (صفرمبنا) به بعد با کمک نقاط ایندکس پیمایش می‌کند"""
+        index = self.load_index()
+        if not index or start_row >= index['row_count']:
+            return
+        checkpoint = start_row // self.checkpoint_every
+        skip = start_row - checkpoint * self.checkpoint_every
+        with open(self.csv_file_path, 'r', encoding='utf-8', newline='') as f:
+            f.seek(index['checkpoints'][checkpoint])
+            reader = csv.reader(f)
+            for values in reader:
+                if not values:
+                    continue
+                if skip:
+                    skip -= 1
+                    continue
+                yield dict(zip(FIELDNAMES, values))
+
+    def append(self, row) -> None:
+        """یک ردیف به انتهای فایل اضافه و ایندکس را به‌روزرسانی می‌کند"""
+        file_exists = os.path.exists(self.csv_file_path)
+        index = self.load_index() if file_exists else None
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=FIELDNAMES, lineterminator='\n')
+        if not file_exists:
+            writer.writeheader()
+        header_len = len(buf.getvalue().encode('utf-8'))
+        writer.writerow(row)
+        data = buf.getvalue().encode('utf-8')
+        with open(self.csv_file_path, 'ab') as f:
+            offset = f.tell()
+            if offset and index and index['size'] and not self._ends_with_newline():
+                data = b'\n' + data
+                offset += 1
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        offset += header_len
+        if index is None:
+            index = {
+                'version': self.INDEX_VERSION,
+                'checkpoint_every': self.checkpoint_every,
+                'size': 0,
+                'row_count': 0,
+                'last_offset': 0,
+                'last_line': '',
+                'checkpoints': [],
+            }
+        if index['row_count'] % self.checkpoint_every == 0:
+            index['checkpoints'].append(offset)
+        index['row_count'] += 1
+        index['size'] = os.path.getsize(self.csv_file_path)
+        index['last_offset'] = offset
+        index['last_line'] = data[header_len:].decode('utf-8').lstrip('\n').rstrip('\r\n')
+        self._write_index(index)
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.csv_file_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
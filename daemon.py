@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""حالت daemon: اجرای طولانی با Session گرم و دریافت تطبیقی قیمت در طول روز.
+
+- در ساعات بازار تهران صفحه با فاصله poll_min دریافت می‌شود و هر بار که قیمت
+  تغییر نکند فاصله تا poll_max دو برابر می‌شود (با اولین تغییر به poll_min برمی‌گردد).
+- هر قیمت جدید درون‌روزی با زمان دریافت در فایل جداگانه `<prefix>.intraday.csv`
+  ثبت می‌شود و CSV روزانه دست نمی‌خورد.
+- پس از بسته شدن بازار، ردیف روزانه با یک اجرای کامل USD2RialsUpdater.run
+  نهایی می‌شود (CSV، JSON، README و انتشار).
+- خارج از ساعات بازار تا باز شدن بعدی (حداکثر idle_interval) صبر می‌شود.
+با SIGTERM یا SIGINT حلقه پس از نوبت جاری متوقف می‌شود.
+"""
+
+import csv
+import os
+import signal
+import threading
+from datetime import datetime, time, timedelta, timezone
+
+from http_cache import row_digest
+
+INTRADAY_FIELDS = ['timestamp', 'date_pr', 'date_gr', 'source', 'price_avg']
+
+
+def tehran_timezone():
+    """منطقه زمانی تهران (بدون tzdata، همان +03:30 ثابت که از 1401 ساعت تابستانی ندارد)"""
+    try:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo('Asia/Tehran')
+    except Exception:
+        return timezone(timedelta(hours=3, minutes=30), 'Asia/Tehran')
+
+
+def parse_clock(value: str) -> time:
+    """ساعت به صورت HH:MM"""
+    hour, minute = value.split(':')
+    return time(int(hour), int(minute))
+
+
+class MarketHours:
+    """ساعات بازار در روزهای کاری (weekday پایتون؛ پیش‌فرض جمعه تعطیل)"""
+
+    def __init__(self, open_time=time(9, 0), close_time=time(17, 0), closed_weekdays=(4,), tz=None):
+        self.open_time = open_time
+        self.close_time = close_time
+        self.closed_weekdays = tuple(closed_weekdays)
+        self.tz = tz or tehran_timezone()
+
+    def now(self) -> datetime:
+        return datetime.now(self.tz)
+
+    def is_trading_day(self, day) -> bool:
+        return day.weekday() not in self.closed_weekdays
+
+    def is_open(self, now: datetime) -> bool:
+        return self.is_trading_day(now.date()) and self.open_time <= now.time() < self.close_time
+
+    def is_after_close(self, now: datetime) -> bool:
+        return self.is_trading_day(now.date()) and now.time() >= self.close_time
+
+    def seconds_until_open(self, now: datetime) -> float:
+        day = now.date()
+        for offset in range(8):
+            candidate = day + timedelta(days=offset)
+            opening = datetime.combine(candidate, self.open_time, tzinfo=now.tzinfo)
+            if self.is_trading_day(candidate) and opening > now:
+                return (opening - now).total_seconds()
+        return 0.0
+
+
+class AdaptivePoller:
+    """فاصله نوبت بعدی: کوتاه هنگام تغییر قیمت، افزایش نمایی هنگام ثابت ماندن"""
+
+    def __init__(self, poll_min=60.0, poll_max=900.0, idle_interval=1800.0, factor=2.0):
+        self.poll_min = poll_min
+        self.poll_max = poll_max
+        self.idle_interval = idle_interval
+        self.factor = factor
+        self.interval = poll_min
+
+    def next_interval(self, changed: bool) -> float:
+        if changed:
+            self.interval = self.poll_min
+        else:
+            self.interval = min(self.interval * self.factor, self.poll_max)
+        return self.interval
+
+    def reset(self) -> None:
+        self.interval = self.poll_min
+
+
+class IntradaySnapshots:
+    """ثبت قیمت‌های درون‌روزی در یک CSV جداگانه (فقط افزودن)"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def append(self, timestamp: datetime, row) -> None:
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, 'a', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=INTRADAY_FIELDS, lineterminator='\n', extrasaction='ignore')
+            if new_file:
+                writer.writeheader()
+            writer.writerow({**row, 'timestamp': timestamp.isoformat(timespec='seconds')})
+
+
+class PollingDaemon:
+    def __init__(self, updater, market=None, poller=None, snapshot_path=None, metrics=None,
+                 clock=None, max_polls=None):
+        self.updater = updater
+        self.market = market or MarketHours()
+        self.poller = poller or AdaptivePoller()
+        self.snapshots = IntradaySnapshots(snapshot_path or updater.symbol.intraday_path)
+        self.metrics = metrics
+        self.clock = clock or self.market.now
+        self.max_polls = max_polls
+        self.polls = 0
+        self.finalized_date = None
+        self._last_digest = None
+        self._stop = threading.Event()
+
+    def stop(self, *_) -> None:
+        print("🛑 توقف daemon درخواست شد")
+        self._stop.set()
+
+    def poll(self, now: datetime) -> bool:
+        """یک نوبت دریافت؛ برمی‌گرداند: آیا قیمت نسبت به نوبت قبل تغییر کرده است"""
+        self.polls += 1
+        row = self.updater.fetch_latest_price()
+        if self.metrics:
+            self.metrics.inc('daemon_polls_total')
+        if not row:
+            return False
+        digest = row_digest(row)
+        if digest == self._last_digest:
+            return False
+        self._last_digest = digest
+        self.snapshots.append(now, row)
+        if self.metrics:
+            self.metrics.inc('daemon_snapshots_total')
+        print(f"📈 {now:%H:%M:%S} قیمت درون‌روزی: {row['date_pr']} - {row['price_avg']:,} ریال")
+        return True
+
+    def finalize(self, now: datetime) -> bool:
+        """نهایی کردن ردیف روزانه پس از بسته شدن بازار با یک اجرای کامل"""
+        print(f"🔒 بسته شدن بازار {now.date()} - نهایی کردن ردیف روزانه")
+        self.polls += 1
+        success = self.updater.run()
+        # در صورت شکست (مثلاً خطای دریافت) روز نهایی‌شده ثبت نمی‌شود تا در نوبت بعد دوباره تلاش شود
+        if success:
+            self.finalized_date = now.date()
+            self.poller.reset()
+        if self.metrics:
+            self.metrics.inc('daemon_finalize_total', ok=int(bool(success)))
+        return success
+
+    def step(self) -> float:
+        """یک نوبت حلقه؛ برمی‌گرداند: ثانیه تا نوبت بعدی"""
+        now = self.clock()
+        try:
+            if self.market.is_open(now):
+                return self.poller.next_interval(self.poll(now))
+            if self.market.is_after_close(now) and self.finalized_date != now.date():
+                if not self.finalize(now):
+                    return self.poller.next_interval(False)
+        except Exception as e:
+            # خطای یک نوبت daemon را متوقف نمی‌کند
+            print(f"⚠️ خطا در نوبت daemon: {e}")
+            return self.poller.next_interval(False)
+        finally:
+            if self.metrics:
+                self.metrics.write_prometheus()
+        return max(1.0, min(self.poller.idle_interval, self.market.seconds_until_open(now)))
+
+    def run(self) -> bool:
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+        print(f"🕰️ daemon {self.updater.symbol.name}: بازار {self.market.open_time:%H:%M}-{self.market.close_time:%H:%M} "
+              f"تهران، فاصله {self.poller.poll_min:g}-{self.poller.poll_max:g} ثانیه")
+        while not self._stop.is_set():
+            interval = self.step()
+            if self.max_polls is not None and self.polls >= self.max_polls:
+                break
+            self._stop.wait(interval)
+        return True
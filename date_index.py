@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""ایندکس درون‌حافظه‌ای ردیف‌های CSV بر اساس تاریخ شمسی.
+
+کلیدها شماره روز (ordinal) هستند و در یک لیست مرتب نگه‌داری می‌شوند؛
+جستجو و درج با bisect انجام می‌شود.
+"""
+
+import csv
+import os
+from bisect import bisect_left
+from datetime import date
+
+import dates
+from csv_store import FIELDNAMES
+
+FRIDAY = 4
+
+
+def _date_key(date_pr: str):
+    parsed = dates.parse_jalali(date_pr)
+    return dates.jalali_to_ordinal(*parsed) if parsed else None
+
+
+class DateIndex:
+    def __init__(self):
+        self._keys = []
+        self._rows = []
+        self.unkeyed = []     # ردیف‌هایی که تاریخ شمسی معتبر ندارند
+        self.duplicates = []  # ردیف‌های تکراری که هنگام ساخت ایندکس کنار گذاشته شدند
+        # ردیف‌های بالا در ایندکس نیستند ولی هنگام نوشتن CSV حذف یا جابه‌جا نمی‌شوند:
+        # هر کدام پس از ردیف کلید قبلی خود (None یعنی ابتدای فایل) نوشته می‌شود
+        self._attached = {}
+
+    @classmethod
+    def from_rows(cls, rows):
+        """ساخت ایندکس در یک پیمایش؛ در صورت بی‌نظمی ورودی فقط یک بار مرتب‌سازی می‌شود"""
+        index = cls()
+        keyed = []
+        in_order = True
+        last_key = None
+        for row in rows:
+            key = _date_key(row.get('date_pr', ''))
+            if key is None:
+                index.unkeyed.append(row)
+                index._attached.setdefault(last_key, []).append(row)
+                continue
+            if last_key is not None and key <= last_key:
+                in_order = False
+            last_key = key
+            keyed.append((key, row))
+        if not in_order:
+            keyed.sort(key=lambda item: item[0])
+        for key, row in keyed:
+            if index._keys and index._keys[-1] == key:
+                index.duplicates.append(row)
+                index._attached.setdefault(key, []).append(row)
+                continue
+            index._keys.append(key)
+            index._rows.append(row)
+        return index
+
+    @classmethod
+    def from_csv(cls, csv_file_path):
+        if not os.path.exists(csv_file_path):
+            return cls()
+        with open(csv_file_path, 'r', encoding='utf-8', newline='') as f:
+            return cls.from_rows(csv.DictReader(f))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _find(self, key):
+        pos = bisect_left(self._keys, key)
+        return pos, pos < len(self._keys) and self._keys[pos] == key
+
+    def __contains__(self, date_pr):
+        key = _date_key(date_pr)
+        return key is not None and self._find(key)[1]
+
+    def get(self, date_pr):
+        key = _date_key(date_pr)
+        if key is None:
+            return None
+        pos, found = self._find(key)
+        return self._rows[pos] if found else None
+
+    def add(self, row) -> bool:
+        """ردیف را در جای درست درج می‌کند؛ تاریخ تکراری یا نامعتبر رد می‌شود (False)"""
+        key = _date_key(row.get('date_pr', ''))
+        if key is None:
+            return False
+        pos, found = self._find(key)
+        if found:
+            return False
+        self._keys.insert(pos, key)
+        self._rows.insert(pos, row)
+        return True
+
+    def upsert(self, row) -> bool:
+        """درج یا جایگزینی ردیف؛ برمی‌گرداند: True اگر ردیف جدید بود"""
+        key = _date_key(row.get('date_pr', ''))
+        if key is None:
+            raise ValueError(f"تاریخ شمسی نامعتبر: {row.get('date_pr')}")
+        pos, found = self._find(key)
+        if found:
+            self._rows[pos] = row
+            return False
+        self._keys.insert(pos, key)
+        self._rows.insert(pos, row)
+        return True
+
+    def rows(self):
+        """ردیف‌ها به ترتیب تاریخ؛ ردیف‌های تکراری و بدون تاریخ معتبر در جای نسبی خود در فایل اصلی"""
+        yield from self._attached.get(None, ())
+        for key, row in zip(self._keys, self._rows):
+            yield row
+            yield from self._attached.get(key, ())
+
+    def first_date(self):
+        return dates.format_jalali(*dates.ordinal_to_jalali(self._keys[0])) if self._keys else None
+
+    def last_date(self):
+        return dates.format_jalali(*dates.ordinal_to_jalali(self._keys[-1])) if self._keys else None
+
+    def gaps(self, weekend=(FRIDAY,), since: str = None) -> list:
+        """روزهای کاری از دست رفته بین اولین و آخرین تاریخ ایندکس.
+        `weekend` روزهای تعطیل هفته با شماره‌گذاری date.weekday() است (پیش‌فرض: جمعه).
+        برمی‌گرداند: لیست (شروع, پایان, تعداد روز) برای هر بازه پیوسته
+        """
+        if not self._keys:
+            return []
+        start = self._keys[0]
+        if since:
+            since_key = _date_key(since)
+            if since_key is None:
+                raise ValueError(f"تاریخ شمسی نامعتبر: {since}")
+            start = max(start, since_key)
+        weekend = set(weekend)
+        ranges = []
+        pos, _ = self._find(start)
+        expected = start
+        for key in self._keys[pos:]:
+            run_start = None
+            run_length = 0
+            for ordinal in range(expected, key):
+                if date.fromordinal(ordinal).weekday() in weekend:
+                    continue
+                if run_start is None:
+                    run_start = ordinal
+                run_end = ordinal
+                run_length += 1
+            if run_start is not None:
+                ranges.append((
+                    dates.format_jalali(*dates.ordinal_to_jalali(run_start)),
+                    dates.format_jalali(*dates.ordinal_to_jalali(run_end)),
+                    run_length,
+                ))
+            expected = key + 1
+        return ranges
+
+    def write_csv(self, csv_file_path) -> None:
+        """کل ایندکس را به ترتیب تاریخ و به صورت اتمیک در فایل CSV می‌نویسد"""
+        tmp_path = f"{csv_file_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES, lineterminator='\n', extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(self.rows())
+        os.replace(tmp_path, csv_file_path)
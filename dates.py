@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""موتور تاریخ میلادی/شمسی بدون strptime.
+
+تمام تبدیل‌ها با محاسبات عددی انجام می‌شوند و نتیجه رشته‌های خام سایت
+در یک کش LRU محدود نگه‌داری می‌شود.
+"""
+
+import re
+from datetime import date
+from functools import lru_cache
+
+CACHE_SIZE = 65536
+
+PERSIAN_DIGITS = str.maketrans('۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', '01234567890123456789')
+
+_SPLIT_RE = re.compile(r'[/-]')
+_G_DAYS_BEFORE_MONTH = (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+
+
+# --- میلادی ---
+def is_gregorian_leap(year: int) -> bool:
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def gregorian_month_days(year: int, month: int) -> int:
+    if month == 2:
+        return 29 if is_gregorian_leap(year) else 28
+    return 30 if month in (4, 6, 9, 11) else 31
+
+
+def _valid_gregorian(y: int, m: int, d: int) -> bool:
+    return 1 <= y <= 9999 and 1 <= m <= 12 and 1 <= d <= gregorian_month_days(y, m)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_gregorian(date_str: str):
+    """رشته تاریخ میلادی خام سایت را به (سال, ماه, روز) تبدیل می‌کند یا None.
+
+    فرمت‌های پشتیبانی‌شده به ترتیب اولویت: Y/M/D ، M/D/Y و D/M/Y
+    (جداکننده "/" یا "-"، و هر بخش زمانی بعد از فاصله نادیده گرفته می‌شود).
+    """
+    if not date_str:
+        return None
+    tokens = date_str.split()
+    if not tokens:
+        return None
+    parts = tokens[0].replace('-', '/').split('/')
+    if len(parts) != 3 or not all(p.isdecimal() for p in parts):
+        return None
+    a, b, c = parts
+    if len(a) == 4:
+        candidates = ((a, b, c),)
+    elif len(c) == 4:
+        if len(a) <= 2 and len(b) <= 2:
+            candidates = ((c, a, b), (c, b, a))
+        else:
+            candidates = ((c, b, a),)
+    else:
+        return None
+    for y, m, d in candidates:
+        ymd = (int(y), int(m), int(d))
+        if _valid_gregorian(*ymd):
+            return ymd
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_gregorian_date(date_str: str) -> str:
+    """تاریخ میلادی را به فرمت M/D/YYYY (بدون صفر ابتدایی) تبدیل می‌کند.
+    اگر تاریخ قابل تشخیص نباشد، رشته ورودی (بدون فاصله‌های اطراف) برگردانده می‌شود.
+    """
+    if not date_str:
+        return date_str
+    parsed = parse_gregorian(date_str)
+    if parsed:
+        y, m, d = parsed
+        return f"{m}/{d}/{y}"
+    return date_str.strip()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def to_iso_date(date_gr: str) -> str:
+    """تبدیل تاریخ میلادی (M/D/YYYY و انواع مشابه) به ISO 8601 (YYYY-MM-DD)."""
+    if not date_gr:
+        return ""
+    parsed = parse_gregorian(date_gr)
+    if parsed:
+        y, m, d = parsed
+        return f"{y:04d}-{m:02d}-{d:02d}"
+    # سازگاری با رفتار قبلی: تاریخ نامعتبر ولی سه‌بخشی به صورت M/D/Y خوانده می‌شود
+    parts = _SPLIT_RE.split(date_gr.strip())
+    if len(parts) == 3:
+        try:
+            m, d, y = int(parts[0]), int(parts[1]), int(parts[2])
+            return f"{y:04d}-{m:02d}-{d:02d}"
+        except ValueError:
+            pass
+    return ""
+
+
+def to_iso_dates(column) -> list:
+    """نسخه دسته‌ای to_iso_date برای یک ستون کامل از تاریخ‌ها"""
+    seen = {}
+    out = []
+    append = out.append
+    for value in column:
+        iso = seen.get(value)
+        if iso is None:
+            iso = seen[value] = to_iso_date(value)
+        append(iso)
+    return out
+
+
+def gregorian_to_ordinal(y: int, m: int, d: int) -> int:
+    return date(y, m, d).toordinal()
+
+
+# --- شمسی ---
+def gregorian_to_jalali(gy: int, gm: int, gd: int) -> tuple:
+    """تبدیل محاسباتی تاریخ میلادی به شمسی"""
+    gy2 = gy + 1 if gm > 2 else gy
+    days = (355666 + 365 * gy + (gy2 + 3) // 4 - (gy2 + 99) // 100
+            + (gy2 + 399) // 400 + gd + _G_DAYS_BEFORE_MONTH[gm - 1])
+    jy = -1595 + 33 * (days // 12053)
+    days %= 12053
+    jy += 4 * (days // 1461)
+    days %= 1461
+    if days > 365:
+        jy += (days - 1) // 365
+        days = (days - 1) % 365
+    if days < 186:
+        return jy, 1 + days // 31, 1 + days % 31
+    return jy, 7 + (days - 186) // 30, 1 + (days - 186) % 30
+
+
+def jalali_to_gregorian(jy: int, jm: int, jd: int) -> tuple:
+    """تبدیل محاسباتی تاریخ شمسی به میلادی"""
+    jy += 1595
+    days = (-355668 + 365 * jy + (jy // 33) * 8 + ((jy % 33) + 3) // 4 + jd
+            + (31 * (jm - 1) if jm < 7 else (jm - 7) * 30 + 186))
+    gy = 400 * (days // 146097)
+    days %= 146097
+    if days > 36524:
+        days -= 1
+        gy += 100 * (days // 36524)
+        days %= 36524
+        if days >= 365:
+            days += 1
+    gy += 4 * (days // 1461)
+    days %= 1461
+    if days > 365:
+        gy += (days - 1) // 365
+        days = (days - 1) % 365
+    gd = days + 1
+    gm = 1
+    while gm < 12:
+        month_days = gregorian_month_days(gy, gm)
+        if gd <= month_days:
+            break
+        gd -= month_days
+        gm += 1
+    return gy, gm, gd
+
+
+def jalali_to_ordinal(jy: int, jm: int, jd: int) -> int:
+    return gregorian_to_ordinal(*jalali_to_gregorian(jy, jm, jd))
+
+
+def ordinal_to_jalali(ordinal: int) -> tuple:
+    g = date.fromordinal(ordinal)
+    return gregorian_to_jalali(g.year, g.month, g.day)
+
+
+def is_jalali_leap(jy: int) -> bool:
+    return jalali_to_ordinal(jy + 1, 1, 1) - jalali_to_ordinal(jy, 1, 1) == 366
+
+
+def jalali_month_days(jy: int, jm: int) -> int:
+    if jm <= 6:
+        return 31
+    if jm <= 11:
+        return 30
+    return 30 if is_jalali_leap(jy) else 29
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_jalali(date_pr: str):
+    """تاریخ شمسی (با ارقام فارسی یا انگلیسی) را به (سال, ماه, روز) تبدیل می‌کند یا None"""
+    if not date_pr:
+        return None
+    parts = _SPLIT_RE.split(date_pr.strip().translate(PERSIAN_DIGITS))
+    if len(parts) != 3 or not all(p.isdecimal() for p in parts):
+        return None
+    jy, jm, jd = int(parts[0]), int(parts[1]), int(parts[2])
+    if not (1 <= jm <= 12 and 1 <= jd <= jalali_month_days(jy, jm)):
+        return None
+    return jy, jm, jd
+
+
+def format_jalali(jy: int, jm: int, jd: int) -> str:
+    return f"{jy:04d}/{jm:02d}/{jd:02d}"
+
+
+def jalali_from_gregorian_str(date_gr: str) -> str:
+    """تاریخ شمسی متناظر با یک تاریخ میلادی خام (YYYY/MM/DD) یا رشته خالی"""
+    parsed = parse_gregorian(date_gr)
+    return format_jalali(*gregorian_to_jalali(*parsed)) if parsed else ""
+
+
+def dates_match(date_pr: str, date_gr: str) -> bool:
+    """بررسی می‌کند که تاریخ شمسی و میلادی یک روز را نشان دهند"""
+    jalali = parse_jalali(date_pr)
+    gregorian = parse_gregorian(date_gr)
+    if not jalali or not gregorian:
+        return False
+    return gregorian_to_jalali(*gregorian) == jalali
+
+
+def is_first_day_of_month(date_pr: str) -> bool:
+    parsed = parse_jalali(date_pr)
+    return bool(parsed) and parsed[2] == 1
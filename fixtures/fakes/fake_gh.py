@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""جایگزین محلی GitHub CLI برای اجرای آزمایشی مرحله انتشار.
+
+    python update_price.py --gh-command fixtures/fakes/fake_gh.py
+
+آرگومان‌ها در FAKE_GH_LOG (به صورت JSON در هر خط) ثبت می‌شوند؛ FAKE_GH_DELAY
+تأخیر (ثانیه) و FAKE_GH_EXIT کد خروج را تعیین می‌کند.
+"""
+
+import json
+import os
+import sys
+import time
+
+if __name__ == "__main__":
+    time.sleep(float(os.getenv('FAKE_GH_DELAY', '0')))
+    log_path = os.getenv('FAKE_GH_LOG')
+    if log_path:
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(sys.argv[1:], ensure_ascii=False) + '\n')
+    exit_code = int(os.getenv('FAKE_GH_EXIT', '0'))
+    if exit_code:
+        print("fake gh: forced failure", file=sys.stderr)
+    sys.exit(exit_code)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""سرور محلی شبیه Bot API تلگرام برای اجرای آزمایشی مرحله انتشار.
+
+    python fixtures/fakes/fake_telegram.py --port 8081 &
+    TELEGRAM_API_BASE=http://127.0.0.1:8081 TELEGRAM_BOT_TOKEN=x TELEGRAM_CHAT_ID=1 python update_price.py
+
+هر درخواست (متد، اندازه بدنه و نام فایل‌های پیوست) در خروجی استاندارد چاپ می‌شود.
+"""
+
+import argparse
+import json
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        method = self.path.rsplit('/', 1)[-1]
+        filenames = re.findall(rb'filename="([^"]+)"', body)
+        print(json.dumps({
+            'method': method,
+            'bytes': len(body),
+            'files': [name.decode('utf-8') for name in filenames],
+        }, ensure_ascii=False), flush=True)
+        time.sleep(self.delay)
+        payload = json.dumps({'ok': True, 'result': {}}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="سرور آزمایشی Bot API تلگرام")
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--delay', type=float, default=0.0, help="تأخیر پاسخ (ثانیه)")
+    args = parser.parse_args()
+    FakeTelegramHandler.delay = args.delay
+    ThreadingHTTPServer(('127.0.0.1', args.port), FakeTelegramHandler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""استخراج ردیف‌های جدول تاریخچه قیمت از صفحه tgju.
+
+سه پیاده‌سازی وجود دارد:
+    lxml        : تجزیه با lxml و رسیدن مستقیم به ردیف‌ها با XPath (سریع‌ترین)
+    strainer    : BeautifulSoup با SoupStrainer که فقط زیردرخت history-table را می‌سازد
+    html.parser : مسیر قبلی؛ تجزیه کامل صفحه با html.parser خالص پایتون
+در حالت auto ابتدا lxml امتحان می‌شود و در صورت نبود lxml یا پیدا نشدن
+جدول، مسیر html.parser اجرا می‌شود.
+
+lxml و bs4 فقط در اولین تجزیه بارگذاری می‌شوند تا زیرفرمان‌های آفلاین سریع اجرا شوند.
+"""
+
+import threading
+
+PARSERS = ('auto', 'lxml', 'strainer', 'html.parser')
+TABLE_CLASS = 'table widgets-dataTable table-hover text-center history-table'
+
+_TABLE_XPATH = "//table[contains(concat(' ', normalize-space(@class), ' '), ' history-table ')]"
+
+# شیء parser در lxml نباید بین نخ‌ها مشترک باشد (backfill صفحات را هم‌زمان تجزیه می‌کند)
+_local = threading.local()
+
+
+def _lxml_html():
+    """ماژول lxml.html یا None اگر lxml نصب نباشد (lxml اختیاری است)"""
+    try:
+        import lxml.html
+    except ImportError:
+        return None
+    return lxml.html
+
+
+def _utf8_parser(lxml_html):
+    parser = getattr(_local, 'parser', None)
+    if parser is None:
+        parser = _local.parser = lxml_html.HTMLParser(encoding='utf-8')
+    return parser
+
+
+def _cells_lxml(content, limit=None) -> list:
+    lxml_html = _lxml_html()
+    if lxml_html is None:
+        raise ImportError("lxml نصب نشده است")
+    if isinstance(content, bytes):
+        tree = lxml_html.document_fromstring(content, parser=_utf8_parser(lxml_html))
+    else:
+        tree = lxml_html.document_fromstring(content)
+    tables = tree.xpath(_TABLE_XPATH)
+    if not tables:
+        raise ValueError("جدول قیمت در وبسایت پیدا نشد")
+    rows = tables[0].xpath('./tbody/tr')
+    if limit is not None:
+        rows = rows[:limit]
+    return [
+        [''.join(text.strip() for text in td.itertext()) for td in row.iterfind('td')]
+        for row in rows
+    ]
+
+
+def _cells_from_table(table, limit=None) -> list:
+    if not table:
+        raise ValueError("جدول قیمت در وبسایت پیدا نشد")
+    tbody = table.find('tbody')
+    rows = tbody.find_all('tr', limit=limit) if tbody else []
+    return [[td.get_text(strip=True) for td in row.find_all('td')] for row in rows]
+
+
+def _has_history_class(value) -> bool:
+    # هنگام فیلتر در زمان تجزیه، class ممکن است هنوز رشته خام (نه لیست) باشد
+    if not value:
+        return False
+    return 'history-table' in (value.split() if isinstance(value, str) else value)
+
+
+def _cells_strainer(content, limit=None) -> list:
+    from bs4 import BeautifulSoup, SoupStrainer
+    only_table = SoupStrainer('table', attrs={'class': _has_history_class})
+    soup = BeautifulSoup(content, 'lxml' if _lxml_html() is not None else 'html.parser', parse_only=only_table)
+    return _cells_from_table(soup.find('table'), limit)
+
+
+def _cells_html_parser(content, limit=None) -> list:
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(content, 'html.parser')
+    return _cells_from_table(soup.find('table', {'class': TABLE_CLASS}), limit)
+
+
+_BACKENDS = {
+    'lxml': _cells_lxml,
+    'strainer': _cells_strainer,
+    'html.parser': _cells_html_parser,
+}
+
+
+def extract_history_cells(content, parser: str = 'auto', limit=None) -> list:
+    """متن سلول‌های ردیف‌های جدول تاریخچه (حداکثر `limit` ردیف) را برمی‌گرداند"""
+    if parser == 'auto':
+        try:
+            return _cells_lxml(content, limit)
+        except (ImportError, ValueError):
+            return _cells_html_parser(content, limit)
+    backend = _BACKENDS.get(parser)
+    if backend is None:
+        raise ValueError(f"تجزیه‌گر ناشناخته: {parser}")
+    return backend(content, limit)
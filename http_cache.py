@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""کش پاسخ HTTP روی دیسک با درخواست شرطی (ETag / Last-Modified).
+
+برای هر آدرس دو فایل نگه‌داری می‌شود: `<key>.body` (آخرین بدنه) و
+`<key>.json` (اعتبارسنج‌ها، هش بدنه و هش آخرین ردیفی که با موفقیت پردازش
+شده است). به این ترتیب اجرای بعدی می‌تواند تشخیص دهد که چیزی عوض نشده است.
+"""
+
+import hashlib
+import json
+import os
+
+
+def sha256_hex(data) -> str:
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def retry_count(response) -> int:
+    """تعداد تلاش‌های مجدد urllib3 برای یک پاسخ requests (در صورت وجود)"""
+    retries = getattr(getattr(response, 'raw', None), 'retries', None)
+    return len(getattr(retries, 'history', None) or ())
+
+
+def make_session(pool_size=1, retries=3, backoff_factor=0.5, headers=None):
+    """Session با استخر اتصال به اندازه `pool_size` و تلاش مجدد urllib3 با تأخیر نمایی
+    (برای خطاهای 429 و 5xx)؛ requests فقط هنگام ساخت Session بارگذاری می‌شود.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def row_digest(row) -> str:
+    """هش پایدار یک ردیف داده"""
+    return sha256_hex(json.dumps(row, ensure_ascii=False, sort_keys=True))
+
+
+class CachedResponse:
+    def __init__(self, status_code, content, not_modified=False, retries=0):
+        self.status_code = status_code
+        self.content = content
+        self.not_modified = not_modified
+        self.retries = retries
+        self.body_sha256 = sha256_hex(content)
+
+
+class HTTPCache:
+    def __init__(self, cache_dir=".cache/http"):
+        self.cache_dir = cache_dir
+
+    def _paths(self, url):
+        key = sha256_hex(url)[:32]
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.json", f"{base}.body"
+
+    def load_meta(self, url) -> dict:
+        meta_path, _ = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_atomic(self, path, data: bytes) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def save_meta(self, url, meta) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        meta_path, _ = self._paths(url)
+        self._write_atomic(meta_path, json.dumps(meta, ensure_ascii=False, indent=2).encode('utf-8'))
+
+    def get(self, url, headers=None, timeout=30, session=None) -> CachedResponse:
+        """درخواست شرطی؛ در پاسخ 304 بدنه ذخیره‌شده برگردانده می‌شود"""
+        meta = self.load_meta(url)
+        meta_path, body_path = self._paths(url)
+        request_headers = dict(headers or {})
+        if os.path.exists(body_path):
+            if meta.get('etag'):
+                request_headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request_headers['If-Modified-Since'] = meta['last_modified']
+        if session is None:
+            import requests
+            session = requests
+        response = session.get(url, headers=request_headers, timeout=timeout)
+        if response.status_code == 304 and os.path.exists(body_path):
+            with open(body_path, 'rb') as f:
+                return CachedResponse(304, f.read(), not_modified=True, retries=retry_count(response))
+        response.raise_for_status()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._write_atomic(body_path, response.content)
+        meta.update({
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'body_sha256': sha256_hex(response.content),
+        })
+        self.save_meta(url, meta)
+        return CachedResponse(response.status_code, response.content, retries=retry_count(response))
+
+    def is_processed(self, url, response: CachedResponse, row=None) -> bool:
+        """آیا این پاسخ (یا ردیف استخراج‌شده از آن) قبلاً با موفقیت پردازش شده است؟"""
+        meta = self.load_meta(url)
+        if response.not_modified and meta.get('processed_body_sha256') == response.body_sha256:
+            return True
+        return row is not None and meta.get('processed_row_sha256') == row_digest(row)
+
+    def mark_processed(self, url, response: CachedResponse, row) -> None:
+        """ثبت پاسخ و ردیف پس از اجرای موفق کل فرآیند"""
+        meta = self.load_meta(url)
+        meta['processed_body_sha256'] = response.body_sha256
+        meta['processed_row_sha256'] = row_digest(row)
+        self.save_meta(url, meta)
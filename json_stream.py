@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""نویسنده‌های جریانی آرایه JSON.
+
+خروجی بایت به بایت با json.dump(list, ensure_ascii=False, ...) یکسان است،
+اما عناصر یکی‌یکی نوشته می‌شوند تا مصرف حافظه ثابت بماند. فایل ابتدا در
+یک فایل موقت نوشته و در پایان به صورت اتمیک جایگزین فایل اصلی می‌شود.
+"""
+
+import json
+import os
+
+MIN_SEPARATORS = (',', ':')
+
+
+def dumps_pretty_item(item) -> str:
+    """یک عنصر آرایه با تورفتگی 2 (همان شکلی که json.dump با indent=2 می‌نویسد)"""
+    return '\n'.join('  ' + line for line in json.dumps(item, ensure_ascii=False, indent=2).split('\n'))
+
+
+def dumps_min_item(item) -> str:
+    """یک عنصر آرایه فشرده"""
+    return json.dumps(item, ensure_ascii=False, separators=MIN_SEPARATORS)
+
+
+def output_item(row):
+    """آبجکت خروجی JSON یک ردیف CSV (قالب USD2Rials.json) یا None اگر قیمت عدد صحیح نباشد"""
+    price_str = str(row.get('price_avg') or '').replace(',', '').strip()
+    try:
+        price = int(price_str)
+    except ValueError:
+        return None
+    return {
+        'date_pr': (row.get('date_pr') or '').strip(),
+        'date_gr': (row.get('date_gr') or '').strip(),
+        'source': (row.get('source') or '').strip(),
+        'price_avg': price
+    }
+
+
+def append_items(path, size, items, pretty=False) -> int:
+    """افزودن عناصر به انتهای آرایه JSON غیرخالی موجود که `size` بایت است
+    (حذف "]" یا "\n]" پایانی و نوشتن عناصر جدید با همان قالب JSONArrayWriter).
+    برمی‌گرداند: تعداد عناصر اضافه‌شده
+    """
+    dumps, separator, close = (dumps_pretty_item, ',\n', '\n]') if pretty else (dumps_min_item, ',', ']')
+    body = ''.join(separator + dumps(item) for item in items)
+    if not body:
+        return 0
+    with open(path, 'r+b') as f:
+        f.seek(size - len(close))
+        f.truncate()
+        f.write((body + close).encode('utf-8'))
+    return len(items)
+
+
+class JSONArrayWriter:
+    def __init__(self, path, pretty=False):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.count = 0
+        self._dumps = dumps_pretty_item if pretty else dumps_min_item
+        self._separator = ',\n' if pretty else ','
+        self._open, self._close = ('[\n', '\n]') if pretty else ('[', ']')
+        self._file = open(self.tmp_path, 'w', encoding='utf-8')
+
+    def write(self, item) -> None:
+        self._file.write((self._separator if self.count else self._open) + self._dumps(item))
+        self.count += 1
+
+    def close(self) -> None:
+        """بستن آرایه و جایگزینی اتمیک فایل اصلی"""
+        self._file.write(self._close if self.count else '[]')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self) -> None:
+        """رها کردن فایل موقت بدون دست زدن به فایل اصلی"""
+        self._file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
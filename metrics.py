@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""اندازه‌گیری مراحل فرآیند به‌روزرسانی.
+
+هر مرحله با `Metrics.stage(name)` زمان‌گیری می‌شود (time.monotonic) و می‌تواند
+شمارنده‌های عددی مانند bytes و rows را در دیکشنری برگشتی ثبت کند. نتیجه هر
+مرحله به صورت یک خط JSON در لاگ ساخت‌یافته (METRICS_LOG، '-' برای stderr)
+نوشته می‌شود و در پایان همه مقادیر در یک فایل متنی با قالب Prometheus
+(METRICS_FILE، برای textfile collector) ذخیره می‌شوند.
+
+با متغیر محیطی UPDATER_PROFILE (cprofile، tracemalloc یا هر دو با کاما)
+پروفایل اجرا در UPDATER_PROFILE_DIR (پیش‌فرض .cache/profile) ذخیره می‌شود.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+PREFIX = 'usd2rials'
+
+
+class Metrics:
+    def __init__(self, log_path=None, prom_path=None):
+        self.log_path = log_path
+        self.prom_path = prom_path
+        self.stages = {}
+        self.counters = {}
+        self.gauges = {}
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+
+    # --- ثبت ---
+    def log(self, event, **fields) -> None:
+        """یک خط JSON در لاگ ساخت‌یافته (در صورت فعال بودن)"""
+        if not self.log_path:
+            return
+        line = json.dumps({'ts': round(time.time(), 3), 'event': event, **fields}, ensure_ascii=False)
+        with self._lock:
+            if self.log_path == '-':
+                print(line, file=sys.stderr, flush=True)
+            else:
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(line + '\n')
+
+    def record(self, name, seconds, ok=True, labels=None, **fields) -> None:
+        """ثبت نتیجه یک مرحله (زمان، موفقیت و شمارنده‌های آن)"""
+        labels = labels or {}
+        with self._lock:
+            self.stages[(name, _label_key(labels))] = {'seconds': seconds, 'ok': bool(ok), **fields}
+        self.log('stage', stage=name, **labels, seconds=round(seconds, 6), ok=bool(ok), **fields)
+
+    @contextmanager
+    def stage(self, name, labels=None, **fields):
+        """زمان‌گیری یک مرحله؛ با تنظیم fields['ok'] = False می‌توان شکست بدون استثنا را ثبت کرد"""
+        started = time.monotonic()
+        try:
+            yield fields
+        except BaseException as e:
+            fields.setdefault('error', str(e))
+            fields['ok'] = False
+            raise
+        finally:
+            ok = fields.pop('ok', True)
+            self.record(name, time.monotonic() - started, ok, labels, **fields)
+
+    def inc(self, name, value=1, **labels) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.gauges[key] = value
+
+    def scoped(self, **labels):
+        """نمایی از همین Metrics که برچسب‌های ثابت (مثلاً symbol) را به همه مقادیر اضافه می‌کند"""
+        return ScopedMetrics(self, labels)
+
+    # --- خروجی ---
+    def prometheus_text(self) -> str:
+        """همه مقادیر با قالب متنی Prometheus"""
+        series = {}
+
+        def add(name, labels, value, kind):
+            series.setdefault(name, (kind, []))[1].append((labels, value))
+
+        for (stage, stage_labels), data in sorted(self.stages.items()):
+            labels = (('stage', stage),) + stage_labels
+            add(f"{PREFIX}_stage_duration_seconds", labels, data['seconds'], 'gauge')
+            add(f"{PREFIX}_stage_success", labels, int(data['ok']), 'gauge')
+            for field, value in sorted(data.items()):
+                if field not in ('seconds', 'ok') and isinstance(value, (int, float)) and not isinstance(value, bool):
+                    add(f"{PREFIX}_stage_{field}", labels, value, 'gauge')
+        for (name, labels), value in sorted(self.counters.items()):
+            add(f"{PREFIX}_{name}", labels, value, 'counter')
+        for (name, labels), value in sorted(self.gauges.items()):
+            add(f"{PREFIX}_{name}", labels, value, 'gauge')
+
+        lines = []
+        for name, (kind, samples) in series.items():
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ','.join(f'{k}="{_escape(v)}"' for k, v in labels)
+                lines.append(f"{name}{{{label_text}}} {_format_value(value)}" if label_text
+                             else f"{name} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def finish(self, success, **fields) -> None:
+        """ثبت نتیجه کل اجرا، نوشتن لاگ پایانی و فایل Prometheus (به صورت اتمیک)"""
+        duration = time.monotonic() - self._started
+        self.set('run_duration_seconds', duration)
+        self.set('run_success', int(bool(success)))
+        self.set('last_run_timestamp_seconds', round(time.time(), 3))
+        self.log('run', seconds=round(duration, 6), ok=bool(success),
+                 stages={'.'.join([value for _, value in labels] + [name]): round(data['seconds'], 6)
+                         for (name, labels), data in self.stages.items()}, **fields)
+        self.write_prometheus()
+
+    def write_prometheus(self) -> None:
+        """نوشتن اتمیک فایل Prometheus (در حالت daemon پس از هر نوبت نیز فراخوانی می‌شود)"""
+        if not self.prom_path:
+            return
+        try:
+            tmp_path = f"{self.prom_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp_path, self.prom_path)
+        except Exception as e:
+            print(f"⚠️ خطا در نوشتن فایل metrics: {e}")
+
+
+class ScopedMetrics:
+    """Metrics با برچسب‌های ثابت؛ برای اجرای هم‌زمان چند نماد روی یک Metrics مشترک"""
+
+    def __init__(self, metrics, labels):
+        self.metrics = metrics
+        self.labels = labels
+
+    def log(self, event, **fields) -> None:
+        self.metrics.log(event, **self.labels, **fields)
+
+    def record(self, name, seconds, ok=True, **fields) -> None:
+        self.metrics.record(name, seconds, ok, self.labels, **fields)
+
+    def stage(self, name, **fields):
+        return self.metrics.stage(name, self.labels, **fields)
+
+    def inc(self, name, value=1, **labels) -> None:
+        self.metrics.inc(name, value, **self.labels, **labels)
+
+    def set(self, name, value, **labels) -> None:
+        self.metrics.set(name, value, **self.labels, **labels)
+
+
+def _label_key(labels) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+@contextmanager
+def profiling(mode=None, out_dir=None, metrics=None):
+    """پروفایل اختیاری اجرا با cProfile و/یا tracemalloc (مقدار UPDATER_PROFILE)"""
+    mode = mode if mode is not None else os.getenv('UPDATER_PROFILE', '')
+    modes = {m.strip().lower() for m in mode.split(',') if m.strip()}
+    if not modes:
+        yield
+        return
+    out_dir = out_dir or os.getenv('UPDATER_PROFILE_DIR') or '.cache/profile'
+    os.makedirs(out_dir, exist_ok=True)
+    profiler = None
+    if 'cprofile' in modes:
+        import cProfile
+        profiler = cProfile.Profile()
+    if 'tracemalloc' in modes:
+        import tracemalloc
+        tracemalloc.start(25)
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            import pstats
+            profiler.dump_stats(os.path.join(out_dir, 'update.prof'))
+            with open(os.path.join(out_dir, 'update.prof.txt'), 'w', encoding='utf-8') as f:
+                pstats.Stats(profiler, stream=f).sort_stats('cumulative').print_stats(40)
+            print(f"📈 پروفایل cProfile در {out_dir} ذخیره شد")
+        if 'tracemalloc' in modes:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            with open(os.path.join(out_dir, 'tracemalloc.txt'), 'w', encoding='utf-8') as f:
+                f.write(f"current={current} peak={peak}\n")
+                for stat in snapshot.statistics('lineno')[:40]:
+                    f.write(f"{stat}\n")
+            if metrics is not None:
+                metrics.set('peak_traced_memory_bytes', peak)
+            print(f"📈 گزارش tracemalloc در {out_dir} ذخیره شد (اوج حافظه {peak:,} بایت)")
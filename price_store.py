@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""فایل باینری فشرده قیمت‌ها برای جستجوی سریع بدون تجزیه JSON.
+
+ساختار فایل (little-endian):
+    هدر 128 بایتی: magic "U2RB"، نسخه (uint16)، اندازه رکورد (uint16)،
+    تعداد منابع (uint8)، ضریب قیمت (uint32)، سپس جدول نام منابع (7 خانه 16 بایتی، UTF-8)
+    رکوردها: پشت سر هم با طول ثابت 13 بایت (epoch_day:int32, price:int64, source_id:uint8)
+    که epoch_day تعداد روز از 1970-01-01 است و رکوردها بر اساس آن مرتب هستند.
+    قیمت با ممیز ثابت ذخیره می‌شود (قیمت × ضریب) تا قیمت‌های اعشاری CSV (مثلاً 1469.2) هم حفظ شوند.
+"""
+
+import math
+import mmap
+import os
+import struct
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+MAGIC = b'U2RB'
+VERSION = 2
+PRICE_SCALE = 100
+HEADER_SIZE = 128
+MAX_SOURCES = 7
+SOURCE_NAME_SIZE = 16
+_HEADER = struct.Struct('<4sHHBI')
+_RECORD = struct.Struct('<iqB')
+RECORD_SIZE = _RECORD.size
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _numpy():
+    """numpy اختیاری است و فقط در اولین نیاز بارگذاری می‌شود (یا None)"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def record_dtype():
+    """dtype ساخت‌یافته NumPy برای رکوردهای فایل"""
+    np = _numpy()
+    if np is None:
+        raise RuntimeError("برای این عملیات numpy لازم است")
+    return np.dtype([('epoch_day', '<i4'), ('price', '<i8'), ('source_id', 'u1')])
+
+
+def parse_price(value):
+    """قیمت ردیف CSV به صورت عدد (int یا float) یا None"""
+    text = str(value if value is not None else '').replace(',', '').strip()
+    try:
+        price = float(text)
+    except ValueError:
+        return None
+    if not math.isfinite(price):
+        return None
+    return int(price) if price.is_integer() else price
+
+
+def to_fixed(price, scale=PRICE_SCALE) -> int:
+    """قیمت (int یا float) به عدد صحیح با ممیز ثابت"""
+    return price * scale if isinstance(price, int) else round(price * scale)
+
+
+def from_fixed(value: int, scale=PRICE_SCALE):
+    """عدد ممیز ثابت به قیمت (int اگر اعشار نداشته باشد)"""
+    return value // scale if value % scale == 0 else value / scale
+
+
+def to_epoch_day(value) -> int:
+    """تبدیل date یا رشته ISO (YYYY-MM-DD) به شماره روز از 1970-01-01"""
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+def from_epoch_day(epoch_day: int) -> date:
+    return date.fromordinal(epoch_day + EPOCH_ORDINAL)
+
+
+def _pack_header(sources, scale=PRICE_SCALE) -> bytes:
+    if len(sources) > MAX_SOURCES:
+        raise ValueError(f"حداکثر {MAX_SOURCES} منبع در فایل باینری پشتیبانی می‌شود")
+    header = bytearray(HEADER_SIZE)
+    _HEADER.pack_into(header, 0, MAGIC, VERSION, RECORD_SIZE, len(sources), scale)
+    table_offset = HEADER_SIZE - MAX_SOURCES * SOURCE_NAME_SIZE
+    for i, name in enumerate(sources):
+        encoded = name.encode('utf-8')
+        if len(encoded) > SOURCE_NAME_SIZE:
+            raise ValueError(f"نام منبع بیش از حد طولانی است: {name}")
+        start = table_offset + i * SOURCE_NAME_SIZE
+        header[start:start + len(encoded)] = encoded
+    return bytes(header)
+
+
+def _unpack_header(header: bytes) -> tuple:
+    """برمی‌گرداند: (نام منابع, ضریب قیمت)"""
+    magic, version, record_size, source_count, scale = _HEADER.unpack_from(header, 0)
+    if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE or not scale:
+        raise ValueError("فایل باینری قیمت معتبر نیست")
+    table_offset = HEADER_SIZE - MAX_SOURCES * SOURCE_NAME_SIZE
+    return [
+        header[table_offset + i * SOURCE_NAME_SIZE:table_offset + (i + 1) * SOURCE_NAME_SIZE]
+        .rstrip(b'\0').decode('utf-8')
+        for i in range(source_count)
+    ], scale
+
+
+class PriceStoreWriter:
+    """نوشتن جریانی فایل باینری در فایل موقت؛ هدر (با جدول منابع) در پایان نوشته می‌شود"""
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.count = 0
+        self.sources = []
+        self._source_ids = {}
+        self._file = open(self.tmp_path, 'wb')
+        self._file.write(bytes(HEADER_SIZE))
+
+    def write(self, epoch_day: int, price, source: str) -> None:
+        source_id = self._source_ids.get(source)
+        if source_id is None:
+            source_id = self._source_ids[source] = len(self.sources)
+            self.sources.append(source)
+        self._file.write(_RECORD.pack(epoch_day, to_fixed(price), source_id))
+        self.count += 1
+
+    def close(self) -> None:
+        self._file.seek(0)
+        self._file.write(_pack_header(self.sources))
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_price_store(path, records) -> int:
+    """نوشتن کامل فایل از رکوردهای مرتب (epoch_day, price, source) به صورت اتمیک.
+    برمی‌گرداند: تعداد رکوردها
+    """
+    with PriceStoreWriter(path) as writer:
+        for epoch_day, price, source in records:
+            writer.write(epoch_day, price, source)
+    return writer.count
+
+
+def append_price_records(path, records) -> int:
+    """افزودن رکوردها با طول ثابت به انتهای فایل؛ رکورد باید بعد از آخرین روز فایل باشد.
+    برمی‌گرداند: تعداد رکوردهای اضافه‌شده
+    """
+    with open(path, 'r+b') as f:
+        header = f.read(HEADER_SIZE)
+        sources, scale = _unpack_header(header)
+        size = f.seek(0, os.SEEK_END)
+        last_day = None
+        if size > HEADER_SIZE:
+            f.seek(size - RECORD_SIZE)
+            last_day = _RECORD.unpack(f.read(RECORD_SIZE))[0]
+        body = bytearray()
+        for epoch_day, price, source in records:
+            if last_day is not None and epoch_day < last_day:
+                raise ValueError("رکورد جدید قبل از آخرین روز فایل است")
+            last_day = epoch_day
+            if source not in sources:
+                sources.append(source)
+            body += _RECORD.pack(epoch_day, to_fixed(price, scale), sources.index(source))
+        new_header = _pack_header(sources, scale)
+        if new_header != header:
+            # جدول منابع طول ثابت دارد و در جای خود بازنویسی می‌شود
+            f.seek(0)
+            f.write(new_header)
+        f.seek(size)
+        f.write(body)
+    return len(body) // RECORD_SIZE
+
+
+def is_price_store(path) -> bool:
+    """آیا فایل یک فایل باینری قیمت با قالب فعلی است (نسخه‌های قدیمی باید بازسازی شوند)"""
+    try:
+        with open(path, 'rb') as f:
+            _unpack_header(f.read(HEADER_SIZE))
+        return True
+    except (OSError, ValueError, struct.error):
+        return False
+
+
+class PriceStore:
+    """خواننده فایل باینری با mmap؛ جستجوی تاریخ با O(log n) و برش بدون کپی"""
+
+    def __init__(self, path="USD2Rials.bin"):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # فایل خالی قابل نگاشت نیست
+            self._file.close()
+            raise ValueError("فایل باینری قیمت معتبر نیست")
+        self.sources, self.scale = _unpack_header(self._mmap[:HEADER_SIZE])
+        self._view = memoryview(self._mmap)[HEADER_SIZE:]
+        self._count = len(self._view) // RECORD_SIZE
+        self._days = _DayColumn(self._view, self._count)
+
+    def close(self):
+        self._days = None
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        """رکورد شماره i به صورت (date, price, source)"""
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        epoch_day, price, source_id = _RECORD.unpack_from(self._view, i * RECORD_SIZE)
+        return from_epoch_day(epoch_day), from_fixed(price, self.scale), self.sources[source_id]
+
+    def find(self, day) -> int:
+        """شماره رکورد برای یک تاریخ (date یا ISO) یا -1"""
+        epoch_day = to_epoch_day(day)
+        i = bisect_left(self._days, epoch_day)
+        return i if i < self._count and self._days[i] == epoch_day else -1
+
+    def price_on(self, day):
+        """قیمت یک روز یا None"""
+        i = self.find(day)
+        return self[i][1] if i >= 0 else None
+
+    def _bounds(self, start=None, end=None):
+        lo = bisect_left(self._days, to_epoch_day(start)) if start is not None else 0
+        hi = bisect_right(self._days, to_epoch_day(end)) if end is not None else self._count
+        return lo, hi
+
+    def raw_slice(self, start=None, end=None) -> memoryview:
+        """بایت‌های رکوردهای بازه [start, end] بدون کپی"""
+        lo, hi = self._bounds(start, end)
+        return self._view[lo * RECORD_SIZE:hi * RECORD_SIZE]
+
+    def records(self, start=None, end=None):
+        """پیمایش رکوردهای بازه به صورت (epoch_day, price, source_id)؛ price با ممیز ثابت (× scale)"""
+        return _RECORD.iter_unpack(self.raw_slice(start, end))
+
+    def to_numpy(self, start=None, end=None):
+        """آرایه ساخت‌یافته NumPy روی همان حافظه mmap (بدون کپی)؛ ستون price با ممیز ثابت (× scale)"""
+        dtype = record_dtype()
+        lo, hi = self._bounds(start, end)
+        return _numpy().frombuffer(self._mmap, dtype=dtype, count=hi - lo,
+                                   offset=HEADER_SIZE + lo * RECORD_SIZE)
+
+
+class _DayColumn:
+    """دسترسی تصادفی به ستون epoch_day برای bisect"""
+
+    def __init__(self, view, count):
+        self._view = view
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        return struct.unpack_from('<i', self._view, i * RECORD_SIZE)[0]
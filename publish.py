@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""مرحله انتشار: اجرای هم‌زمان مقصدها (GitHub Release و تلگرام).
+
+هر مقصد یک شیء قابل فراخوانی با ویژگی `name` است که (latest_data, csv_row_count)
+را می‌گیرد و True/False برمی‌گرداند. مقصدها روی یک ThreadPoolExecutor
+اجرا می‌شوند، خطای هر مقصد از بقیه جداست و نتیجه و زمان هر کدام گزارش می‌شود.
+"""
+
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+TELEGRAM_API_BASE = "https://api.telegram.org"
+
+
+class PublishResult:
+    def __init__(self, name, ok, latency, error=None):
+        self.name = name
+        self.ok = ok
+        self.latency = latency
+        self.error = error
+
+    def __repr__(self):
+        return f"PublishResult({self.name!r}, ok={self.ok}, latency={self.latency:.3f})"
+
+
+class GitHubReleaseSink:
+    """ایجاد GitHub Release با `gh`؛ با gh_command می‌توان یک جایگزین محلی اجرا کرد"""
+
+    name = 'github_release'
+
+    def __init__(self, updater):
+        self.updater = updater
+
+    def __call__(self, latest_data, csv_row_count) -> bool:
+        return self.updater.create_github_release(latest_data, csv_row_count)
+
+
+class TelegramSink:
+    """ارسال پیام و فایل‌های فشرده (gzip) به صورت یک media group روی یک Session مشترک"""
+
+    name = 'telegram'
+
+    def __init__(self, bot_token, chat_id, files, session=None, api_base=None, timeout=30):
+        self.bot_token = bot_token
+        self.chat_id = chat_id
+        self.files = files
+        if session is None:
+            import requests
+            session = requests.Session()
+        self.session = session
+        self.api_base = (api_base or os.getenv('TELEGRAM_API_BASE') or TELEGRAM_API_BASE).rstrip('/')
+        self.timeout = timeout
+        self.sent_bytes = 0
+
+    def _url(self, method):
+        return f"{self.api_base}/bot{self.bot_token}/{method}"
+
+    def _post(self, method, data, files=None):
+        response = self.session.post(self._url(method), data=data, files=files, timeout=self.timeout)
+        if response.status_code != 200:
+            raise RuntimeError(f"{method}: {response.text}")
+        return response
+
+    def _compressed_documents(self):
+        """فایل‌های موجود به صورت gzip در حافظه: [(نام پیوست, نام فایل, بایت‌ها)]"""
+        documents = []
+        for path in self.files:
+            if not os.path.exists(path):
+                print(f"⚠️ فایل {path} یافت نشد")
+                continue
+            with open(path, 'rb') as f:
+                data = gzip.compress(f.read(), compresslevel=9, mtime=0)
+            documents.append((f"file{len(documents)}", f"{os.path.basename(path)}.gz", data))
+        return documents
+
+    def send_message(self, text) -> None:
+        self._post('sendMessage', {'chat_id': self.chat_id, 'text': text})
+
+    def send_documents(self) -> int:
+        """ارسال فایل‌ها در یک درخواست (sendMediaGroup، یا sendDocument برای یک فایل)"""
+        documents = self._compressed_documents()
+        if not documents:
+            return 0
+        if len(documents) == 1:
+            _, filename, data = documents[0]
+            self._post('sendDocument', {'chat_id': self.chat_id}, files={'document': (filename, data)})
+            self.sent_bytes += len(data)
+            return 1
+        media = [{'type': 'document', 'media': f"attach://{key}"} for key, _, _ in documents]
+        files = {key: (filename, data) for key, filename, data in documents}
+        self._post('sendMediaGroup', {'chat_id': self.chat_id, 'media': json.dumps(media)}, files=files)
+        self.sent_bytes += sum(len(data) for _, _, data in documents)
+        return len(documents)
+
+    def __call__(self, latest_data, csv_row_count) -> bool:
+        message = f"""به‌روزرسانی تا {latest_data['date_pr']} - {latest_data['date_gr']}
+تعداد ردیف‌های CSV: {csv_row_count:,}"""
+        self.send_message(message)
+        sent = self.send_documents()
+        print(f"✅ {sent} فایل فشرده به تلگرام ارسال شد")
+        return True
+
+
+def _timed(sink, latest_data, csv_row_count) -> PublishResult:
+    started = time.monotonic()
+    try:
+        ok = bool(sink(latest_data, csv_row_count))
+        return PublishResult(sink.name, ok, time.monotonic() - started)
+    except Exception as e:
+        return PublishResult(sink.name, False, time.monotonic() - started, str(e))
+
+
+def publish(sinks, latest_data, csv_row_count) -> list:
+    """اجرای هم‌زمان مقصدها و گزارش نتیجه و زمان هر کدام"""
+    if not sinks:
+        return []
+    with ThreadPoolExecutor(max_workers=len(sinks)) as pool:
+        futures = [pool.submit(_timed, sink, latest_data, csv_row_count) for sink in sinks]
+        results = [future.result() for future in futures]
+    for result in results:
+        status = "✅" if result.ok else "❌"
+        detail = f" - {result.error}" if result.error else ""
+        print(f"{status} انتشار {result.name}: {result.latency:.2f} ثانیه{detail}")
+    return results
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""پرس‌وجوی تحلیلی برداری روی تاریخچه قیمت.
+
+تاریخچه یک بار در آرایه‌های NumPy بارگذاری می‌شود و تمام محاسبات
+(بازه، OHLC هفتگی/ماه شمسی، میانگین و نوسان متحرک، درصد تغییر) بدون
+حلقه پایتونی روی ردیف‌ها انجام می‌شوند.
+"""
+
+import csv
+
+import numpy as np
+
+import dates
+from price_store import EPOCH_ORDINAL, PriceStore, from_epoch_day, is_price_store, to_epoch_day
+
+# 1970-01-01 پنجشنبه است؛ هفته ایرانی از شنبه (روز 2) شروع می‌شود
+_SATURDAY_OFFSET = 2
+
+
+def parse_query_date(value: str) -> int:
+    """تاریخ ورودی (ISO میلادی یا شمسی با /) را به epoch_day تبدیل می‌کند"""
+    if '/' in value:
+        parsed = dates.parse_jalali(value)
+        if not parsed:
+            raise ValueError(f"تاریخ شمسی نامعتبر: {value}")
+        return dates.jalali_to_ordinal(*parsed) - EPOCH_ORDINAL
+    return to_epoch_day(value)
+
+
+class PriceHistory:
+    def __init__(self, days, prices):
+        order = np.argsort(days, kind='stable')
+        self.days = np.ascontiguousarray(days[order], dtype=np.int32)
+        self.prices = np.ascontiguousarray(prices[order], dtype=np.float64)
+
+    @classmethod
+    def from_store(cls, path="USD2Rials.bin"):
+        with PriceStore(path) as store:
+            records = store.to_numpy()
+            # قیمت‌ها با ممیز ثابت ذخیره شده‌اند
+            history = cls(records['epoch_day'].copy(), records['price'] / store.scale)
+            del records
+        return history
+
+    @classmethod
+    def from_csv(cls, csv_file_path="USD2Rials.csv"):
+        """بارگذاری از CSV (شامل قیمت‌های اعشاری که در خروجی‌های JSON حذف می‌شوند)"""
+        with open(csv_file_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            columns = [(row['date_gr'], row['price_avg']) for row in reader]
+        isos = dates.to_iso_dates([gr for gr, _ in columns])
+        days = []
+        prices = []
+        for iso, (_, price) in zip(isos, columns):
+            try:
+                days.append(to_epoch_day(iso))
+                prices.append(float(price.replace(',', '')))
+            except ValueError:
+                continue
+        return cls(np.array(days, dtype=np.int32), np.array(prices, dtype=np.float64))
+
+    @classmethod
+    def load(cls, bin_path="USD2Rials.bin", csv_file_path="USD2Rials.csv"):
+        """فایل باینری (شامل همه ردیف‌های دارای تاریخ CSV) یا در نبود آن خود CSV"""
+        if bin_path and is_price_store(bin_path):
+            return cls.from_store(bin_path)
+        return cls.from_csv(csv_file_path)
+
+    def __len__(self):
+        return len(self.days)
+
+    # --- بازه ---
+    def _bounds(self, start=None, end=None):
+        lo = np.searchsorted(self.days, start, 'left') if start is not None else 0
+        hi = np.searchsorted(self.days, end, 'right') if end is not None else len(self.days)
+        return lo, hi
+
+    def range(self, start=None, end=None):
+        """روزها و قیمت‌های بازه [start, end] (epoch_day) به صورت view"""
+        lo, hi = self._bounds(start, end)
+        return self.days[lo:hi], self.prices[lo:hi]
+
+    def price_at(self, epoch_days):
+        """آخرین قیمت ثبت‌شده در روز داده‌شده یا قبل از آن (NaN اگر وجود نداشته باشد)"""
+        pos = np.searchsorted(self.days, epoch_days, 'right') - 1
+        out = self.prices[np.clip(pos, 0, None)].copy()
+        out[pos < 0] = np.nan
+        return out
+
+    # --- OHLC ---
+    def _ohlc(self, keys, days, prices):
+        if not len(keys):
+            empty = np.array([], dtype=np.float64)
+            return {'key': keys, 'start': days, 'open': empty, 'high': empty,
+                    'low': empty, 'close': empty, 'count': keys}
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], len(keys)]
+        return {
+            'key': keys[starts],
+            'start': days[starts],
+            'open': prices[starts],
+            'high': np.maximum.reduceat(prices, starts),
+            'low': np.minimum.reduceat(prices, starts),
+            'close': prices[ends - 1],
+            'count': ends - starts,
+        }
+
+    def weekly_ohlc(self, start=None, end=None):
+        """OHLC هفتگی (هفته از شنبه)؛ key شماره هفته از epoch است"""
+        days, prices = self.range(start, end)
+        keys = (days.astype(np.int64) - _SATURDAY_OFFSET) // 7
+        return self._ohlc(keys, days, prices)
+
+    def jalali_year_month(self, days):
+        """سال و ماه شمسی برای آرایه‌ای از epoch_day به صورت برداری"""
+        if not len(days):
+            return days.astype(np.int64), days.astype(np.int64)
+        first = dates.ordinal_to_jalali(int(days.min()) + EPOCH_ORDINAL)[0]
+        last = dates.ordinal_to_jalali(int(days.max()) + EPOCH_ORDINAL)[0]
+        # یک حلقه روی سال‌ها (نه ردیف‌ها) برای روز اول فروردین هر سال
+        years = np.arange(first, last + 2)
+        nowruz = np.array([dates.jalali_to_ordinal(int(y), 1, 1) - EPOCH_ORDINAL for y in years])
+        idx = np.searchsorted(nowruz, days, 'right') - 1
+        doy = days - nowruz[idx]
+        month = np.where(doy < 186, doy // 31 + 1, (doy - 186) // 30 + 7)
+        return years[idx], month
+
+    def monthly_ohlc(self, start=None, end=None):
+        """OHLC ماه شمسی؛ key به صورت YYYYMM شمسی است"""
+        days, prices = self.range(start, end)
+        year, month = self.jalali_year_month(days)
+        return self._ohlc(year * 100 + month, days, prices)
+
+    # --- آمار متحرک ---
+    def rolling_mean(self, window: int):
+        """میانگین متحرک روی `window` ردیف (NaN برای ردیف‌های ابتدایی)"""
+        out = np.full(len(self.prices), np.nan)
+        if window <= 0 or window > len(self.prices):
+            return out
+        csum = np.cumsum(np.r_[0.0, self.prices])
+        out[window - 1:] = (csum[window:] - csum[:-window]) / window
+        return out
+
+    def log_returns(self):
+        out = np.full(len(self.prices), np.nan)
+        out[1:] = np.diff(np.log(self.prices))
+        return out
+
+    def rolling_volatility(self, window: int):
+        """انحراف معیار متحرک بازده لگاریتمی روزانه روی `window` ردیف"""
+        out = np.full(len(self.prices), np.nan)
+        returns = self.log_returns()[1:]
+        if window <= 1 or window > len(returns):
+            return out
+        csum = np.cumsum(np.r_[0.0, returns])
+        csum2 = np.cumsum(np.r_[0.0, returns * returns])
+        total = csum[window:] - csum[:-window]
+        total2 = csum2[window:] - csum2[:-window]
+        variance = (total2 - total * total / window) / (window - 1)
+        out[window:] = np.sqrt(np.clip(variance, 0, None))
+        return out
+
+    def pct_change(self, days: int):
+        """درصد تغییر نسبت به `days` روز تقویمی قبل (آخرین قیمت موجود تا آن روز)"""
+        base = self.price_at(self.days - days)
+        return (self.prices / base - 1.0) * 100.0
+
+
+def _to_rows(columns, date_keys=('start',)):
+    """تبدیل ستون‌های NumPy به لیست دیکشنری برای خروجی JSON"""
+    names = list(columns)
+    out = []
+    for values in zip(*(columns[name].tolist() for name in names)):
+        row = dict(zip(names, values))
+        for key in date_keys:
+            if key in row:
+                row[key] = from_epoch_day(row[key]).isoformat()
+        for key, value in row.items():
+            if isinstance(value, float) and value != value:
+                row[key] = None
+        out.append(row)
+    return out
+
+
+def run_query(history: PriceHistory, kind: str, start=None, end=None, window: int = 30, days: int = 30):
+    """اجرای یک پرس‌وجو و بازگرداندن نتیجه قابل تبدیل به JSON"""
+    lo, hi = history._bounds(start, end)
+    if kind == 'range':
+        return _to_rows({'date': history.days[lo:hi], 'price': history.prices[lo:hi]}, ('date',))
+    if kind == 'weekly':
+        return _to_rows(history.weekly_ohlc(start, end))
+    if kind == 'monthly':
+        return _to_rows(history.monthly_ohlc(start, end))
+    if kind == 'rolling':
+        return _to_rows({
+            'date': history.days[lo:hi],
+            'price': history.prices[lo:hi],
+            'mean': history.rolling_mean(window)[lo:hi],
+            'volatility': history.rolling_volatility(window)[lo:hi],
+        }, ('date',))
+    if kind == 'change':
+        return _to_rows({
+            'date': history.days[lo:hi],
+            'price': history.prices[lo:hi],
+            'pct_change': history.pct_change(days)[lo:hi],
+        }, ('date',))
+    raise ValueError(f"نوع پرس‌وجوی ناشناخته: {kind}")
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""خروجی‌های تفکیک‌شده بر اساس سال شمسی.
+
+برای هر سال شمسی دو فایل `<سال>.csv` و `<سال>.json` (همان قالب USD2Rials.json)
+ساخته می‌شود و `manifest.json` تعداد ردیف‌ها، بازه تاریخ و هش sha256 هر بخش را
+نگه می‌دارد تا کلاینت‌ها فقط سال‌های مورد نیاز را دریافت کنند و تازگی آن‌ها را
+تنها از روی manifest بررسی کنند.
+
+در افزودن یک ردیف فقط فایل‌های سال همان ردیف تغییر می‌کنند و در بازسازی کامل
+فقط بخش‌هایی که محتوایشان عوض شده است جایگزین می‌شوند.
+"""
+
+import csv
+import io
+import json
+import os
+
+import dates
+from artifacts import file_sha256
+from csv_store import FIELDNAMES
+from json_stream import JSONArrayWriter, append_items, output_item
+
+MANIFEST_VERSION = 1
+
+
+def shard_key(row):
+    """سال شمسی ردیف به صورت رشته (مثلاً '1404') یا None"""
+    parsed = dates.parse_jalali((row.get('date_pr') or '').strip())
+    return str(parsed[0]) if parsed else None
+
+
+def _csv_line(row) -> str:
+    buf = io.StringIO()
+    csv.DictWriter(buf, fieldnames=FIELDNAMES, lineterminator='\n').writerow(
+        {name: row.get(name, '') for name in FIELDNAMES})
+    return buf.getvalue()
+
+
+class _ShardBuilder:
+    """نوشتن جریانی یک بخش در فایل‌های موقت به همراه آمار manifest"""
+
+    def __init__(self, csv_path, json_path):
+        self.csv_path = csv_path
+        self.json_path = json_path
+        self.csv_tmp_path = f"{csv_path}.new"
+        self._csv_file = open(self.csv_tmp_path, 'w', encoding='utf-8', newline='')
+        self._csv_file.write(','.join(FIELDNAMES) + '\n')
+        self._json = JSONArrayWriter(f"{json_path}.new", pretty=True)
+        self.entry = _empty_entry()
+
+    def write(self, row) -> None:
+        self._csv_file.write(_csv_line(row))
+        item = output_item(row)
+        if item is not None:
+            self._json.write(item)
+        _track(self.entry, row, item)
+
+    def close(self):
+        """جایگزینی فایل‌ها فقط در صورت تغییر محتوا؛ برمی‌گرداند: (entry, تعداد فایل‌های جایگزین‌شده)"""
+        self._csv_file.close()
+        self._json.close()
+        replaced = 0
+        for path, new_path in ((self.csv_path, self.csv_tmp_path), (self.json_path, self._json.path)):
+            if os.path.exists(path) and _same_file(path, new_path):
+                # فایل بدون تغییر دست نمی‌خورد (زمان تغییر و diff گیت ثابت می‌ماند)
+                os.remove(new_path)
+            else:
+                os.replace(new_path, path)
+                replaced += 1
+        _finish_entry(self.entry, self.csv_path, self.json_path)
+        return self.entry, replaced
+
+    def abort(self) -> None:
+        self._csv_file.close()
+        if os.path.exists(self.csv_tmp_path):
+            os.remove(self.csv_tmp_path)
+        self._json.abort()
+
+
+def _same_file(a, b) -> bool:
+    return os.path.getsize(a) == os.path.getsize(b) and file_sha256(a) == file_sha256(b)
+
+
+def _empty_entry() -> dict:
+    return {'rows': 0, 'json_rows': 0, 'first_date_pr': None, 'last_date_pr': None,
+            'first_date_iso': None, 'last_date_iso': None}
+
+
+def _track(entry, row, item) -> None:
+    """به‌روزرسانی تعداد ردیف‌ها و بازه تاریخ یک بخش با یک ردیف"""
+    entry['rows'] += 1
+    if item is not None:
+        entry['json_rows'] += 1
+    date_pr = (row.get('date_pr') or '').strip()
+    parsed = dates.parse_jalali(date_pr)
+    if parsed:
+        first = dates.parse_jalali(entry['first_date_pr'] or '')
+        last = dates.parse_jalali(entry['last_date_pr'] or '')
+        if not first or parsed < first:
+            entry['first_date_pr'] = dates.format_jalali(*parsed)
+        if not last or parsed > last:
+            entry['last_date_pr'] = dates.format_jalali(*parsed)
+    iso = dates.to_iso_date((row.get('date_gr') or '').strip())
+    if iso:
+        if not entry['first_date_iso'] or iso < entry['first_date_iso']:
+            entry['first_date_iso'] = iso
+        if not entry['last_date_iso'] or iso > entry['last_date_iso']:
+            entry['last_date_iso'] = iso
+
+
+def _finish_entry(entry, csv_path, json_path) -> None:
+    entry.update({
+        'csv': os.path.basename(csv_path),
+        'csv_size': os.path.getsize(csv_path),
+        'csv_sha256': file_sha256(csv_path),
+        'json': os.path.basename(json_path),
+        'json_size': os.path.getsize(json_path),
+        'json_sha256': file_sha256(json_path),
+    })
+
+
+class ShardedOutputs:
+    """فایل‌های سالانه در `shard_dir` و manifest.json آن‌ها"""
+
+    def __init__(self, shard_dir="shards"):
+        self.shard_dir = shard_dir
+        self.manifest_path = os.path.join(shard_dir, "manifest.json")
+
+    def _paths(self, year):
+        return os.path.join(self.shard_dir, f"{year}.csv"), os.path.join(self.shard_dir, f"{year}.json")
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            return manifest if manifest.get('version') == MANIFEST_VERSION else None
+        except (OSError, ValueError):
+            return None
+
+    def is_current(self, row_count) -> bool:
+        """آیا manifest همه `row_count` ردیف CSV را پوشش می‌دهد (ردیف‌هایی که از مسیری غیر از
+        append به CSV رسیده‌اند، مثلاً backfill، بخش‌ها را کهنه می‌کنند)
+        """
+        manifest = self.load_manifest()
+        return manifest is not None and manifest['total_rows'] + manifest['skipped_rows'] == row_count
+
+    def _save_manifest(self, shards, skipped) -> None:
+        years = sorted(shards)
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'fields': FIELDNAMES,
+            'total_rows': sum(entry['rows'] for entry in shards.values()),
+            'skipped_rows': skipped,
+            'first_year': years[0] if years else None,
+            'last_year': years[-1] if years else None,
+            'shards': {year: shards[year] for year in years},
+        }
+        if self.load_manifest() == manifest:
+            return
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def rebuild(self, csv_file_path) -> int:
+        """ساخت همه بخش‌ها از روی CSV؛ فایل بخش‌های بدون تغییر بازنویسی نمی‌شوند.
+        برمی‌گرداند: تعداد فایل‌های جایگزین‌شده
+        """
+        os.makedirs(self.shard_dir, exist_ok=True)
+        builders = {}
+        skipped = 0
+        try:
+            with open(csv_file_path, 'r', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    year = shard_key(row)
+                    if year is None:
+                        skipped += 1
+                        continue
+                    builder = builders.get(year)
+                    if builder is None:
+                        builder = builders[year] = _ShardBuilder(*self._paths(year))
+                    builder.write(row)
+        except BaseException:
+            for builder in builders.values():
+                builder.abort()
+            raise
+        shards = {}
+        replaced = 0
+        for year, builder in builders.items():
+            shards[year], count = builder.close()
+            replaced += count
+        # حذف بخش‌های سال‌هایی که دیگر در CSV نیستند
+        previous = self.load_manifest()
+        for year in (previous or {}).get('shards', {}):
+            if year not in shards:
+                for path in self._paths(year):
+                    if os.path.exists(path):
+                        os.remove(path)
+                        replaced += 1
+        self._save_manifest(shards, skipped)
+        return replaced
+
+    def append(self, row, csv_file_path, row_count=None) -> bool:
+        """افزودن یک ردیف جدید (که قبلاً به CSV اصلی اضافه شده) به بخش سال خودش.
+        `row_count` تعداد ردیف‌های CSV پس از این افزودن است؛ اگر manifest بدون این ردیف با آن
+        برابر نباشد یا manifest و فایل‌های بخش با هم نخوانند، همه بخش‌ها از روی CSV بازسازی می‌شوند.
+        """
+        year = shard_key(row)
+        manifest = self.load_manifest()
+        if manifest is None or (row_count is not None
+                                and manifest['total_rows'] + manifest['skipped_rows'] != row_count - 1):
+            self.rebuild(csv_file_path)
+            return True
+        if year is None:
+            manifest['skipped_rows'] += 1
+            self._save_manifest(manifest['shards'], manifest['skipped_rows'])
+            return True
+        csv_path, json_path = self._paths(year)
+        entry = manifest['shards'].get(year)
+        if entry is None:
+            if os.path.exists(csv_path) or os.path.exists(json_path):
+                self.rebuild(csv_file_path)
+                return True
+            builder = _ShardBuilder(csv_path, json_path)
+            builder.write(row)
+            manifest['shards'][year], _ = builder.close()
+            self._save_manifest(manifest['shards'], manifest['skipped_rows'])
+            return True
+        if (not os.path.exists(csv_path) or os.path.getsize(csv_path) != entry['csv_size']
+                or not os.path.exists(json_path) or os.path.getsize(json_path) != entry['json_size']):
+            print(f"ℹ️ بخش {year} با manifest همخوانی ندارد - بازسازی بخش‌ها")
+            self.rebuild(csv_file_path)
+            return True
+
+        item = output_item(row)
+        with open(csv_path, 'a', encoding='utf-8', newline='') as f:
+            f.write(_csv_line(row))
+        if item is not None:
+            if entry['json_rows']:
+                append_items(json_path, entry['json_size'], [item], pretty=True)
+            else:
+                with JSONArrayWriter(json_path, pretty=True) as writer:
+                    writer.write(item)
+        _track(entry, row, item)
+        _finish_entry(entry, csv_path, json_path)
+        self._save_manifest(manifest['shards'], manifest['skipped_rows'])
+        return True
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""خلاصه آماری تاریخچه با به‌روزرسانی افزایشی.
+
+شامل بیشترین و کمترین قیمت تاریخ با تاریخ آن‌ها، قیمت باز و بسته و تغییر هر سال
+شمسی، میانگین متحرک 30، 90 و 365 روزه (روز تقویمی تا آخرین ردیف) و تعداد ردیف‌ها.
+افزودن هر ردیف جدید O(1) است (سرشکن): فقط ردیف‌های پنجره 365 روزه نگه‌داری و
+ردیف‌های قدیمی‌تر از ابتدای هر پنجره حذف می‌شوند. خلاصه در فایل جانبی
+`<prefix>.stats.json` ذخیره می‌شود و در صورت ناهماهنگی با CSV (اندازه یا آخرین
+ردیف) از نو ساخته می‌شود.
+"""
+
+import csv
+import json
+import math
+import os
+from collections import deque
+
+import dates
+from csv_store import CSVStore
+from price_store import parse_price
+
+STATS_VERSION = 1
+WINDOWS = (30, 90, 365)
+
+
+class SummaryStats:
+    def __init__(self):
+        self.row_count = 0
+        self.skipped = 0
+        self.high = None
+        self.low = None
+        self.years = {}
+        self.last_ordinal = None
+        self.last_date_pr = None
+        self._windows = {n: deque() for n in WINDOWS}
+        self._sums = {n: 0.0 for n in WINDOWS}
+
+    @classmethod
+    def from_rows(cls, rows):
+        stats = cls()
+        for row in rows:
+            stats.add(row)
+        return stats
+
+    def add(self, row) -> bool:
+        """افزودن یک ردیف (به ترتیب تاریخ)؛ برمی‌گرداند: آیا ردیف در آمار قیمت حساب شد.
+        ردیف با تاریخ قدیمی‌تر از آخرین ردیف ValueError می‌دهد (نیازمند بازسازی است).
+        """
+        self.row_count += 1
+        date_pr = (row.get('date_pr') or '').strip()
+        parsed = dates.parse_jalali(date_pr)
+        price = parse_price(row.get('price_avg'))
+        if not parsed or price is None:
+            self.skipped += 1
+            return False
+        ordinal = dates.jalali_to_ordinal(*parsed)
+        if self.last_ordinal is not None and ordinal < self.last_ordinal:
+            self.row_count -= 1
+            raise ValueError(f"ردیف {date_pr} قبل از آخرین ردیف آمار است")
+        point = {'price': price, 'date_pr': date_pr, 'date_gr': (row.get('date_gr') or '').strip()}
+
+        # بیشترین و کمترین (در تساوی، اولین رخداد حفظ می‌شود)
+        if self.high is None or price > self.high['price']:
+            self.high = point
+        if self.low is None or price < self.low['price']:
+            self.low = point
+
+        # سال شمسی
+        year = str(parsed[0])
+        entry = self.years.get(year)
+        if entry is None:
+            entry = self.years[year] = {'open': price, 'open_date': date_pr, 'high': price, 'low': price,
+                                        'rows': 0}
+        entry['close'] = price
+        entry['close_date'] = date_pr
+        entry['high'] = max(entry['high'], price)
+        entry['low'] = min(entry['low'], price)
+        entry['rows'] += 1
+
+        # پنجره‌های میانگین متحرک: ردیف‌های (آخرین روز - n, آخرین روز]
+        self.last_ordinal = ordinal
+        self.last_date_pr = date_pr
+        for n, window in self._windows.items():
+            window.append((ordinal, price))
+            self._sums[n] += price
+            while window[0][0] <= ordinal - n:
+                self._sums[n] -= window.popleft()[1]
+        return True
+
+    # --- مقادیر محاسبه‌شده ---
+    def moving_averages(self) -> dict:
+        return {str(n): (self._sums[n] / len(window) if window else None)
+                for n, window in self._windows.items()}
+
+    def year_summary(self, year) -> dict:
+        entry = self.years.get(str(year))
+        if not entry:
+            return None
+        change = entry['close'] - entry['open']
+        return {**entry, 'change': change,
+                'change_pct': change / entry['open'] * 100 if entry['open'] else None}
+
+    def summary(self) -> dict:
+        """خلاصه قابل نمایش (بدون وضعیت داخلی پنجره‌ها)"""
+        return {
+            'row_count': self.row_count,
+            'skipped': self.skipped,
+            'last_date_pr': self.last_date_pr,
+            'high': self.high,
+            'low': self.low,
+            'moving_averages': self.moving_averages(),
+            'years': {year: self.year_summary(year) for year in sorted(self.years)},
+        }
+
+    # --- ذخیره و بازیابی ---
+    def to_dict(self) -> dict:
+        return {
+            'row_count': self.row_count,
+            'skipped': self.skipped,
+            'high': self.high,
+            'low': self.low,
+            'years': self.years,
+            'last_ordinal': self.last_ordinal,
+            'last_date_pr': self.last_date_pr,
+            # فقط بلندترین پنجره ذخیره می‌شود؛ پنجره‌های کوتاه‌تر زیرمجموعه آن هستند
+            'window': list(self._windows[max(WINDOWS)]),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.row_count = data['row_count']
+        stats.skipped = data['skipped']
+        stats.high = data['high']
+        stats.low = data['low']
+        stats.years = data['years']
+        stats.last_ordinal = data['last_ordinal']
+        stats.last_date_pr = data['last_date_pr']
+        for ordinal, price in data['window']:
+            for n, window in stats._windows.items():
+                if ordinal > stats.last_ordinal - n:
+                    window.append((ordinal, price))
+                    stats._sums[n] += price
+        return stats
+
+
+def _iter_csv(csv_file_path):
+    if not os.path.exists(csv_file_path):
+        return
+    with open(csv_file_path, 'r', encoding='utf-8', newline='') as f:
+        yield from csv.DictReader(f)
+
+
+def _close(a, b) -> bool:
+    if isinstance(a, float) or isinstance(b, float):
+        return a is not None and b is not None and math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+    return a == b
+
+
+def _diff(prefix, a, b, out) -> None:
+    if isinstance(a, dict) and isinstance(b, dict):
+        for key in sorted(set(a) | set(b)):
+            _diff(f"{prefix}.{key}" if prefix else str(key), a.get(key), b.get(key), out)
+    elif not _close(a, b):
+        out.append(f"{prefix}: {a!r} != {b!r}")
+
+
+class StatsCache:
+    """فایل جانبی خلاصه آماری و همگام نگه داشتن آن با CSV"""
+
+    def __init__(self, path="USD2Rials.stats.json"):
+        self.path = path
+        self._stats = None
+        self._meta = None
+
+    def _csv_meta(self, csv_file_path) -> dict:
+        store = CSVStore(csv_file_path)
+        return {
+            'csv_size': os.path.getsize(csv_file_path) if os.path.exists(csv_file_path) else 0,
+            'last_row': store.last_entry(),
+        }
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != STATS_VERSION:
+                return None, None
+            return SummaryStats.from_dict(data['stats']), {'csv_size': data['csv_size'], 'last_row': data['last_row']}
+        except (OSError, ValueError, KeyError, TypeError):
+            return None, None
+
+    def save(self, stats, meta) -> None:
+        data = {'version': STATS_VERSION, **meta, 'summary': stats.summary(), 'stats': stats.to_dict()}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+        self._stats, self._meta = stats, meta
+
+    def rebuild(self, csv_file_path) -> SummaryStats:
+        """محاسبه کامل از روی CSV و ذخیره"""
+        stats = SummaryStats.from_rows(_iter_csv(csv_file_path))
+        self.save(stats, self._csv_meta(csv_file_path))
+        return stats
+
+    def load(self, csv_file_path) -> SummaryStats:
+        """خلاصه هماهنگ با CSV فعلی (در صورت ناهماهنگی بازسازی می‌شود)"""
+        if self._stats is None:
+            self._stats, self._meta = self._read()
+        if self._stats is None or self._meta != self._csv_meta(csv_file_path):
+            if self._stats is not None:
+                print("ℹ️ خلاصه آماری با CSV همخوانی ندارد - بازسازی کامل")
+            return self.rebuild(csv_file_path)
+        return self._stats
+
+    def append(self, row, csv_file_path, csv_size_before) -> SummaryStats:
+        """به‌روزرسانی O(1) پس از افزودن یک ردیف به انتهای CSV.
+        اگر خلاصه ذخیره‌شده متعلق به CSV پیش از این افزودن نباشد، بازسازی کامل انجام می‌شود.
+        """
+        if self._stats is None:
+            self._stats, self._meta = self._read()
+        if self._stats is None or self._meta.get('csv_size') != csv_size_before:
+            return self.rebuild(csv_file_path)
+        try:
+            self._stats.add(row)
+        except ValueError:
+            return self.rebuild(csv_file_path)
+        self.save(self._stats, self._csv_meta(csv_file_path))
+        return self._stats
+
+    def verify(self, csv_file_path) -> list:
+        """مقایسه خلاصه ذخیره‌شده با محاسبه کامل؛ برمی‌گرداند: لیست اختلاف‌ها (خالی یعنی یکسان)"""
+        cached, meta = self._read()
+        if cached is None:
+            return ["فایل خلاصه آماری وجود ندارد یا معتبر نیست"]
+        differences = []
+        if meta != self._csv_meta(csv_file_path):
+            differences.append("خلاصه آماری متعلق به نسخه دیگری از CSV است")
+        full = SummaryStats.from_rows(_iter_csv(csv_file_path))
+        _diff('', cached.summary(), full.summary(), differences)
+        return differences
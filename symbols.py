@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""فهرست نمادهای قابل پیگیری از صفحات پروفایل tgju.
+
+هر نماد آدرس صفحه تاریخچه، نگاشت ستون‌های جدول و پیشوند فایل‌های خروجی خود
+را دارد (مثلاً EUR2Rials.csv، EUR2Rials.json، ...). نماد usd همان فایل‌های
+قبلی USD2Rials.* را استفاده می‌کند.
+"""
+
+TGJU_PROFILE_URL = "https://www.tgju.org/profile/{slug}/history"
+
+# ترتیب ستون‌های جدول تاریخچه tgju:
+# بیشترین، کمترین، بیشترین، میانگین، تغییر، درصد تغییر، تاریخ میلادی، تاریخ شمسی
+DEFAULT_COLUMNS = {'min': 1, 'max': 2, 'date_gr': 6, 'date_pr': 7}
+
+
+class Symbol:
+    def __init__(self, key, slug, prefix, name, columns=None, source='tgju'):
+        self.key = key
+        self.slug = slug
+        self.prefix = prefix
+        self.name = name
+        self.columns = {**DEFAULT_COLUMNS, **(columns or {})}
+        self.source = source
+
+    def __repr__(self):
+        return f"Symbol({self.key!r}, {self.slug!r})"
+
+    @property
+    def url(self) -> str:
+        return TGJU_PROFILE_URL.format(slug=self.slug)
+
+    @property
+    def csv_path(self) -> str:
+        return f"{self.prefix}.csv"
+
+    @property
+    def json_path(self) -> str:
+        return f"{self.prefix}.json"
+
+    @property
+    def min_path(self) -> str:
+        return f"{self.prefix}.min.json"
+
+    @property
+    def bin_path(self) -> str:
+        return f"{self.prefix}.bin"
+
+    @property
+    def state_path(self) -> str:
+        return f"{self.prefix}.state.json"
+
+    @property
+    def release_state_path(self) -> str:
+        return f"{self.prefix}.release.json"
+
+    @property
+    def stats_path(self) -> str:
+        return f"{self.prefix}.stats.json"
+
+    @property
+    def intraday_path(self) -> str:
+        return f"{self.prefix}.intraday.csv"
+
+    @property
+    def output_paths(self) -> list:
+        return [self.csv_path, self.json_path, self.min_path, self.bin_path]
+
+
+SYMBOLS = {
+    symbol.key: symbol for symbol in (
+        Symbol('usd', 'price_dollar_rl', 'USD2Rials', 'دلار'),
+        Symbol('eur', 'price_eur', 'EUR2Rials', 'یورو'),
+        Symbol('aed', 'price_aed', 'AED2Rials', 'درهم امارات'),
+        Symbol('coin', 'sekee', 'GoldCoin2Rials', 'سکه امامی'),
+        Symbol('gold18', 'geram18', 'Gold18k2Rials', 'طلای ۱۸ عیار'),
+    )
+}
+PRIMARY_SYMBOL = 'usd'
+
+
+def get_symbols(keys) -> list:
+    """نمادها از روی کلیدها (لیست یا رشته جدا شده با کاما؛ 'all' برای همه)"""
+    if isinstance(keys, str):
+        keys = [key.strip().lower() for key in keys.split(',') if key.strip()]
+    if not keys or keys == ['all']:
+        return list(SYMBOLS.values())
+    unknown = [key for key in keys if key not in SYMBOLS]
+    if unknown:
+        raise ValueError(f"نماد ناشناخته: {', '.join(unknown)} (نمادهای موجود: {', '.join(SYMBOLS)})")
+    return [SYMBOLS[key] for key in dict.fromkeys(keys)]
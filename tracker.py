@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""به‌روزرسانی هم‌زمان چند نماد (دلار، یورو، درهم، سکه، طلا) در یک اجرا.
+
+برای هر نماد یک USD2RialsUpdater با فایل‌های خودش ساخته می‌شود؛ همه روی یک
+Session مشترک (یک استخر اتصال به tgju با اندازه تعداد نخ‌ها) کار می‌کنند تا
+اتصال‌های TLS دوباره استفاده شوند. تعداد اجرای هم‌زمان محدود است و خطای هر
+نماد از بقیه جداست. README، GitHub Release و تلگرام فقط برای نماد اصلی (usd)
+اجرا می‌شوند.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from http_cache import make_session
+from metrics import Metrics
+from symbols import PRIMARY_SYMBOL
+from update_price import USD2RialsUpdater
+
+
+class SymbolResult:
+    def __init__(self, key, ok, latency, error=None):
+        self.key = key
+        self.ok = ok
+        self.latency = latency
+        self.error = error
+
+    def __repr__(self):
+        return f"SymbolResult({self.key!r}, ok={self.ok}, latency={self.latency:.3f})"
+
+
+class MultiSymbolTracker:
+    def __init__(self, symbols, max_workers=4, retries=2, backoff_factor=0.5, parser="auto",
+                 http_cache_dir=".cache/http", gh_command="gh", shard_dir=None, metrics=None):
+        self.symbols = list(symbols)
+        self.max_workers = max(1, min(max_workers, len(self.symbols)))
+        self.metrics = metrics or Metrics()
+        # Session مشترک با استخر اتصال به اندازه تعداد نخ‌ها
+        self.session = make_session(self.max_workers, retries, backoff_factor)
+        self.updaters = [
+            USD2RialsUpdater(parser=parser, http_cache_dir=http_cache_dir, gh_command=gh_command,
+                             shard_dir=self._shard_dir(shard_dir, symbol), symbol=symbol,
+                             metrics=self.metrics.scoped(symbol=symbol.key), session=self.session)
+            for symbol in self.symbols
+        ]
+
+    @staticmethod
+    def _shard_dir(shard_dir, symbol):
+        # فایل‌های سالانه نماد اصلی در همان پوشه قبلی و بقیه در زیرپوشه‌ای به نام نماد
+        if not shard_dir or symbol.key == PRIMARY_SYMBOL:
+            return shard_dir
+        return os.path.join(shard_dir, symbol.key)
+
+    def _run_symbol(self, updater) -> SymbolResult:
+        started = time.monotonic()
+        try:
+            ok = bool(updater.run(publish=updater.symbol.key == PRIMARY_SYMBOL))
+            return SymbolResult(updater.symbol.key, ok, time.monotonic() - started)
+        except Exception as e:
+            return SymbolResult(updater.symbol.key, False, time.monotonic() - started, str(e))
+
+    def run(self) -> list:
+        """اجرای هم‌زمان همه نمادها؛ برمی‌گرداند: نتیجه هر نماد به ترتیب ورودی"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(self._run_symbol, self.updaters))
+        for updater, result in zip(self.updaters, results):
+            status = "✅" if result.ok else "❌"
+            detail = f" - {result.error}" if result.error else ""
+            print(f"{status} {updater.symbol.name} ({result.key}): {result.latency:.2f} ثانیه{detail}")
+            self.metrics.record('symbol', result.latency, result.ok, {'symbol': result.key},
+                                **({'error': result.error} if result.error else {}))
+        failed = [result.key for result in results if not result.ok]
+        if failed:
+            print(f"⚠️ به‌روزرسانی {len(failed)} نماد ناموفق بود: {', '.join(failed)}")
+        return results
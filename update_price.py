@@ -1,141 +1,212 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import requests
-from bs4 import BeautifulSoup
+import argparse
 import csv
 import os
-from datetime import datetime
-import re
 import json
 import subprocess
 from pathlib import Path
 
+import dates
+from artifacts import ReleaseState, build_release_artifacts, file_sha256
+from csv_store import CSVStore
+from date_index import DateIndex
+from history_parser import PARSERS, extract_history_cells
+from http_cache import HTTPCache, make_session, retry_count
+from metrics import Metrics, profiling
+from publish import GitHubReleaseSink, TelegramSink, publish
+from shards import ShardedOutputs
+from stats import StatsCache
+from symbols import PRIMARY_SYMBOL, SYMBOLS, get_symbols
+from json_stream import JSONArrayWriter, append_items, output_item
+from price_store import PriceStoreWriter, append_price_records, is_price_store, parse_price, to_epoch_day
+
 class USD2RialsUpdater:
-    def __init__(self, csv_file_path="USD2Rials.csv"):
+    def __init__(self, csv_file_path=None, json_state_path=None, parser="auto",
+                 http_cache_dir=".cache/http", gh_command="gh", shard_dir=None, metrics=None,
+                 symbol=None, session=None, stats_path=None):
+        # نماد (آدرس صفحه، نگاشت ستون‌ها و نام فایل‌ها)؛ پیش‌فرض دلار با همان فایل‌های USD2Rials.*
+        self.symbol = symbol or SYMBOLS[PRIMARY_SYMBOL]
+        csv_file_path = csv_file_path or self.symbol.csv_path
+        json_state_path = json_state_path or self.symbol.state_path
         self.csv_file_path = csv_file_path
-        self.url = "https://www.tgju.org/profile/price_dollar_rl/history"
+        self.metrics = metrics or Metrics()
+        self.gh_command = gh_command
+        # Session می‌تواند بین چند نماد مشترک باشد (استخر اتصال واحد)
+        self._session = session
+        self.parser = parser
+        self.http_cache = HTTPCache(http_cache_dir) if http_cache_dir else None
+        self._last_response = None
+        self.fetch_unchanged = False
+        self.json_state_path = json_state_path
+        self.store = CSVStore(csv_file_path)
+        self._date_index = None
+        # خروجی‌های سالانه (شمسی) فقط در صورت تعیین shard_dir ساخته می‌شوند
+        self.shards = ShardedOutputs(shard_dir) if shard_dir else None
+        # خلاصه آماری (بیشترین/کمترین، تغییر سالانه، میانگین متحرک) با به‌روزرسانی افزایشی
+        self.stats = StatsCache(stats_path or self.symbol.stats_path)
+        self.url = self.symbol.url
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
     
+    @property
+    def session(self):
+        """Session HTTP با تلاش مجدد urllib3 (همان تنظیمات tracker و backfill)؛
+        requests فقط در اولین درخواست بارگذاری می‌شود
+        """
+        if self._session is None:
+            self._session = make_session()
+        return self._session
+
     def normalize_gregorian_date(self, date_str: str) -> str:
+        """نرمال‌سازی تاریخ میلادی خام سایت به M/D/YYYY (با کش LRU در ماژول dates)"""
+        return dates.normalize_gregorian_date(date_str)
 
-        if not date_str:
-            return date_str
-        date_str = date_str.strip()
-        date_part = date_str.split()[0]
-        date_part = date_part.replace('-', '/')
-        parsed = None
-        for fmt in ('%Y/%m/%d', '%m/%d/%Y', '%d/%m/%Y'):
-            try:
-                parsed = datetime.strptime(date_part, fmt)
-                break
-            except ValueError:
-                continue
-        if parsed is None:
-            try:
-                parts = re.split(r'[/-]', date_part)
-                if len(parts) == 3:
-                    if len(parts[0]) == 4 and parts[0].isdigit():
-                        y, m, d = int(parts[0]), int(parts[1]), int(parts[2])
-                    elif len(parts[2]) == 4 and parts[2].isdigit():
-                        d, m, y = int(parts[0]), int(parts[1]), int(parts[2])
-                    else:
-                        raise ValueError
-                    parsed = datetime(y, m, d)
-            except Exception:
-                parsed = None
-        if parsed:
-            return f"{parsed.month}/{parsed.day}/{parsed.year}"
-        return date_str
+    def parse_history_cells(self, cells) -> dict:
+        """یک ردیف جدول تاریخچه (لیست متن سلول‌ها) را به ردیف CSV تبدیل می‌کند"""
+        columns = self.symbol.columns
+        if len(cells) <= max(columns.values()):
+            raise ValueError("تعداد ستون‌های مورد انتظار در جدول پیدا نشد")
+        
+        # شماره ستون‌ها از نگاشت نماد (پیش‌فرض: بیشترین، کمترین، بیشترین، میانگین، تغییر، درصد تغییر، تاریخ میلادی، تاریخ شمسی)
+        min_price_text = cells[columns['min']]  # کمترین قیمت
+        max_price_text = cells[columns['max']]  # بیشترین قیمت
+        raw_gregorian_date = cells[columns['date_gr']]  # تاریخ میلادی (خام از سایت)
+        gregorian_date = self.normalize_gregorian_date(raw_gregorian_date)  # نرمال‌سازی به Month/Day/Year (M/D/YYYY)
+        persian_date = cells[columns['date_pr']]    # تاریخ شمسی
+        if not dates.dates_match(persian_date, gregorian_date):
+            print(f"⚠️ تاریخ شمسی {persian_date} با تاریخ میلادی {gregorian_date} همخوانی ندارد")
+        
+        # تبدیل قیمت‌ها به عدد
+        min_price = int(min_price_text.replace(',', ''))
+        max_price = int(max_price_text.replace(',', ''))
+        avg_price = (min_price + max_price) // 2
+        
+        return {
+            'date_pr': persian_date,
+            'date_gr': gregorian_date,
+            'source': self.symbol.source,
+            'price_avg': avg_price
+        }
+
+    def parse_history_rows(self, content, limit=None) -> list:
+        """ردیف‌های جدول تاریخچه صفحه tgju را استخراج می‌کند (حداکثر `limit` ردیف)"""
+        return [self.parse_history_cells(cells) for cells in extract_history_cells(content, self.parser, limit)]
 
     def fetch_latest_price(self):
         """از وبسایت tgju آخرین قیمت دلار را دریافت می‌کند"""
+        self.fetch_unchanged = False
         try:
-            response = requests.get(self.url, headers=self.headers, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # پیدا کردن جدول تاریخچه قیمت
-            table = soup.find('table', {'class': 'table widgets-dataTable table-hover text-center history-table'})
-            if not table:
-                raise ValueError("جدول قیمت در وبسایت پیدا نشد")
-            
-            # پیدا کردن اولین ردیف داده (بدون هدر)
-            first_row = table.find('tbody').find('tr')
-            if not first_row:
+            with self.metrics.stage('fetch') as stage:
+                if self.http_cache:
+                    # درخواست شرطی با ETag / Last-Modified ذخیره‌شده
+                    response = self.http_cache.get(self.url, headers=self.headers, timeout=30, session=self.session)
+                    retries = response.retries
+                else:
+                    response = self.session.get(self.url, headers=self.headers, timeout=30)
+                    retries = retry_count(response)
+                    response.raise_for_status()
+                stage.update(http_status=response.status_code, bytes=len(response.content), retries=retries,
+                             not_modified=int(bool(getattr(response, 'not_modified', False))))
+            self.metrics.inc('http_responses_total', status=response.status_code)
+            self.metrics.inc('http_retries_total', retries)
+            self._last_response = response
+            
+            # پیدا کردن اولین ردیف داده
+            with self.metrics.stage('parse', parser=self.parser) as stage:
+                rows = self.parse_history_rows(response.content, limit=1)
+                stage['rows'] = len(rows)
+            if not rows:
                 raise ValueError("هیچ ردیف داده‌ای در جدول پیدا نشد")
-            
-            cells = first_row.find_all('td')
-            if len(cells) < 8:
-                raise ValueError("تعداد ستون‌های مورد انتظار در جدول پیدا نشد")
-            
-            # استخراج داده‌ها از ردیف اول
-            # ترتیب: بیشترین، کمترین، بیشترین، میانگین، تغییر، درصد تغییر، تاریخ میلادی، تاریخ شمسی
-            min_price_text = cells[1].get_text(strip=True)  # کمترین قیمت
-            max_price_text = cells[2].get_text(strip=True)  # بیشترین قیمت
-            raw_gregorian_date = cells[6].get_text(strip=True)  # تاریخ میلادی (خام از سایت)
-            gregorian_date = self.normalize_gregorian_date(raw_gregorian_date)  # نرمال‌سازی به Month/Day/Year (M/D/YYYY)
-            persian_date = cells[7].get_text(strip=True)    # تاریخ شمسی
-            
-            # تبدیل قیمت‌ها به عدد
-            min_price = int(min_price_text.replace(',', ''))
-            max_price = int(max_price_text.replace(',', ''))
-            avg_price = (min_price + max_price) // 2
-            
-            return {
-                'date_pr': persian_date,
-                'date_gr': gregorian_date,
-                'source': 'tgju',
-                'price_avg': avg_price
-            }
+            if self.http_cache:
+                self.fetch_unchanged = self.http_cache.is_processed(self.url, response, rows[0])
+            return rows[0]
             
         except Exception as e:
             print(f"خطا در دریافت اطلاعات از وبسایت: {str(e)}")
             return None
     
     def get_last_entry(self):
-        """آخرین ردیف از فایل CSV را بازمی‌گرداند"""
+        """آخرین ردیف از فایل CSV را بازمی‌گرداند (با خواندن از انتهای فایل)"""
         try:
-            if not os.path.exists(self.csv_file_path):
-                return None
-                
-            with open(self.csv_file_path, 'r', encoding='utf-8') as file:
-                csv_reader = csv.DictReader(file)
-                last_row = None
-                for row in csv_reader:
-                    last_row = row
-                return last_row
+            return self.store.last_entry()
         except Exception as e:
             print(f"خطا در خواندن آخرین ردیف: {str(e)}")
             return None
     
+    def get_date_index(self) -> DateIndex:
+        """ایندکس تاریخ ردیف‌های CSV (در اولین نیاز با یک پیمایش ساخته می‌شود)"""
+        if self._date_index is None:
+            self._date_index = DateIndex.from_csv(self.csv_file_path)
+        return self._date_index
+
+    def is_after_last_entry(self, new_data, last_entry) -> bool:
+        """بررسی می‌کند که تاریخ داده جدید بعد از آخرین ردیف فایل باشد"""
+        if not last_entry:
+            return True
+        new_date = dates.parse_jalali(new_data['date_pr'])
+        last_date = dates.parse_jalali(last_entry['date_pr'])
+        return bool(new_date and last_date and new_date > last_date)
+
     def is_new_data(self, new_data, last_entry):
         """بررسی می‌کند که آیا داده جدید است یا نه"""
         if not last_entry:
             return True
-        return new_data['date_pr'] != last_entry['date_pr']
+        if new_data['date_pr'] == last_entry['date_pr']:
+            return False
+        if self.is_after_last_entry(new_data, last_entry):
+            return True
+        # تاریخ قدیمی‌تر از آخرین ردیف: فقط در صورت نبودن در ایندکس جدید است
+        return new_data['date_pr'] not in self.get_date_index()
     
     def append_to_csv(self, new_data):
-        """داده جدید را به فایل CSV اضافه می‌کند"""
+        """داده جدید را به فایل CSV اضافه و ایندکس آن را به‌روزرسانی می‌کند"""
         try:
-            file_exists = os.path.exists(self.csv_file_path)
-            
-            with open(self.csv_file_path, 'a', newline='', encoding='utf-8') as file:
-                fieldnames = ['date_pr', 'date_gr', 'source', 'price_avg']
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
-                
-                # اگر فایل وجود ندارد، هدر را بنویس
-                if not file_exists:
-                    writer.writeheader()
-                
-                writer.writerow(new_data)
-            return True
+            size_before = os.path.getsize(self.csv_file_path) if os.path.exists(self.csv_file_path) else 0
+            self.store.append(new_data)
+            if self._date_index is not None:
+                self._date_index.add(dict(new_data))
         except Exception as e:
             print(f"خطا در نوشتن در فایل CSV: {str(e)}")
             return False
+        if self.shards:
+            # فقط فایل‌های سال همین ردیف تغییر می‌کنند
+            try:
+                self.shards.append(new_data, self.csv_file_path, self.store.row_count())
+            except Exception as e:
+                print(f"⚠️ خطا در به‌روزرسانی فایل‌های سالانه: {e}")
+        # به‌روزرسانی O(1) خلاصه آماری (یا بازسازی اگر با CSV قبلی همخوانی نداشت)
+        try:
+            self.stats.append(new_data, self.csv_file_path, size_before)
+        except Exception as e:
+            print(f"⚠️ خطا در به‌روزرسانی خلاصه آماری: {e}")
+        return True
+
+    def rebuild_shards(self) -> bool:
+        """بازسازی فایل‌های سالانه از روی CSV (فایل‌های بدون تغییر بازنویسی نمی‌شوند)"""
+        try:
+            replaced = self.shards.rebuild(self.csv_file_path)
+            print(f"✅ فایل‌های سالانه بررسی شدند ({replaced} فایل تغییر کرد)")
+            return True
+        except Exception as e:
+            print(f"⚠️ خطا در ساخت فایل‌های سالانه: {e}")
+            return False
+
+    def insert_into_csv(self, new_data):
+        """داده‌ای با تاریخ قدیمی‌تر از آخرین ردیف را در جای درست CSV درج می‌کند (تاریخ تکراری رد می‌شود)"""
+        try:
+            index = self.get_date_index()
+            if not index.add(dict(new_data)):
+                print(f"⚠️ تاریخ {new_data['date_pr']} تکراری یا نامعتبر است")
+                return False
+            index.write_csv(self.csv_file_path)
+            self.store.rebuild_index()
+            return True
+        except Exception as e:
+            print(f"خطا در درج در فایل CSV: {str(e)}")
+            return False
     
     def calculate_price_change(self, current_price, previous_price):
         """محاسبه تغییر قیمت و جهت آن"""
@@ -153,82 +224,258 @@ class USD2RialsUpdater:
     # --- JSON helpers ---
     def to_iso_date(self, date_gr: str) -> str:
         """تبدیل تاریخ میلادی (M/D/YYYY و انواع مشابه) به ISO 8601 (YYYY-MM-DD)."""
-        if not date_gr:
-            return ""
-        norm = self.normalize_gregorian_date(date_gr)
-        try:
-            dt = datetime.strptime(norm, "%m/%d/%Y")
-            return dt.strftime("%Y-%m-%d")
-        except Exception:
-            try:
-                parts = re.split(r"[/-]", norm)
-                if len(parts) == 3:
-                    m, d, y = int(parts[0]), int(parts[1]), int(parts[2])
-                    return f"{y:04d}-{m:02d}-{d:02d}"
-            except Exception:
-                pass
-        return ""
+        return dates.to_iso_date(date_gr)
 
     def get_csv_row_count(self) -> int:
-        """تعداد ردیف‌های CSV را برمی‌گرداند (بدون هدر)"""
+        """تعداد ردیف‌های CSV را برمی‌گرداند (بدون هدر) - از ایندکس ذخیره‌شده"""
         try:
-            if not os.path.exists(self.csv_file_path):
-                return 0
-            with open(self.csv_file_path, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                next(reader, None)  # رد کردن هدر
-                return sum(1 for _ in reader)
+            return self.store.row_count()
         except Exception as e:
             print(f"خطا در شمارش ردیف‌های CSV: {e}")
             return 0
 
-    def regenerate_json_files(self, pretty_path: str = "USD2Rials.json", min_path: str = "USD2Rials.min.json") -> tuple[bool, int]:
-        """از روی CSV دو خروجی JSON تولید می‌کند:
+    def _price_records(self, rows):
+        """رکوردهای فایل باینری (epoch_day, price, source) از ردیف‌های (تاریخ ISO, قیمت, منبع)"""
+        records = []
+        for iso, price, source in rows:
+            try:
+                records.append((to_epoch_day(iso), price, source))
+            except ValueError:
+                continue
+        return records
+
+    def _output_row(self, row):
+        """(تاریخ ISO, آبجکت خروجی JSON, قیمت, منبع) یک ردیف CSV یا None برای قیمت نامعتبر.
+        ردیف با قیمت اعشاری آبجکت JSON ندارد (None) و فقط در فایل باینری نوشته می‌شود.
+        """
+        item = output_item(row)
+        price = item['price_avg'] if item else parse_price(row.get('price_avg'))
+        if price is None:
+            return None
+        return dates.to_iso_date((row.get('date_gr') or '').strip()), item, price, (row.get('source') or '').strip()
+
+    def _iter_output_rows(self, stats):
+        """ردیف‌های CSV به صورت خروجی _output_row به ترتیب فایل؛ ردیف‌های با قیمت نامعتبر حذف می‌شوند.
+        تعداد کل ردیف‌های خوانده‌شده در stats['rows'] شمرده می‌شود.
+        """
+        with open(self.csv_file_path, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                stats['rows'] += 1
+                output = self._output_row(row)
+                if output is not None:
+                    yield output
+
+    def _write_outputs(self, rows, pretty_path: str, min_path: str, bin_path: str):
+        """ردیف‌های مرتب را جریانی در خروجی‌ها می‌نویسد (ردیف‌های بدون تاریخ در انتهای فایل کامل).
+        اگر ترتیب تاریخ رعایت نشده باشد، فایل‌های موقت رها شده و None برمی‌گردد.
+        برمی‌گرداند: (تعداد آبجکت‌ها, تعداد ردیف‌های مینیمال, آخرین تاریخ ISO)
+        """
+        writers = [JSONArrayWriter(min_path), JSONArrayWriter(pretty_path, pretty=True)]
+        if bin_path:
+            writers.append(PriceStoreWriter(bin_path))
+        min_writer, pretty_writer = writers[0], writers[1]
+        bin_writer = writers[2] if bin_path else None
+        try:
+            undated = []
+            last_iso = ''
+            for iso, item, price, source in rows:
+                if not iso:
+                    if item is not None:
+                        undated.append(item)
+                    continue
+                if iso < last_iso:
+                    for writer in writers:
+                        writer.abort()
+                    return None
+                last_iso = iso
+                if item is not None:
+                    pretty_writer.write(item)
+                    min_writer.write([iso, item['price_avg']])
+                if bin_writer:
+                    try:
+                        epoch_day = to_epoch_day(iso)
+                    except ValueError:
+                        continue
+                    bin_writer.write(epoch_day, price, source)
+            for item in undated:
+                pretty_writer.write(item)
+        except BaseException:
+            for writer in writers:
+                writer.abort()
+            raise
+        for writer in writers:
+            writer.close()
+        return pretty_writer.count, min_writer.count, last_iso
+
+    def _output_paths(self, pretty_path, min_path, bin_path):
+        """مسیرهای خروجی؛ مقدار None یعنی فایل پیش‌فرض نماد"""
+        return (self.symbol.json_path if pretty_path is None else pretty_path,
+                self.symbol.min_path if min_path is None else min_path,
+                self.symbol.bin_path if bin_path is None else bin_path)
+
+    def regenerate_json_files(self, pretty_path: str = None, min_path: str = None,
+                              bin_path: str = None) -> tuple[bool, int]:
+        """از روی CSV دو خروجی JSON (و در صورت تعیین bin_path فایل باینری) تولید می‌کند:
         1) فایل غیر فشرده شامل تمام ستون‌ها به صورت آرایه‌ای از آبجکت‌ها
         2) فایل مینیمال به صورت [["YYYY-MM-DD", price], ...]
+        3) فایل باینری با رکوردهای طول ثابت همه ردیف‌های دارای تاریخ (شامل قیمت‌های اعشاری؛ price_store.py)
+        ردیف‌ها جریانی نوشته می‌شوند و فقط اگر CSV مرتب نباشد کل داده برای مرتب‌سازی در حافظه بارگذاری می‌شود.
         برمی‌گرداند: (موفقیت, تعداد ردیف‌ها)
         """
+        pretty_path, min_path, bin_path = self._output_paths(pretty_path, min_path, bin_path)
         try:
-            full_rows = []
-            min_rows = []
-            row_count = 0
-            with open(self.csv_file_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    row_count += 1
-                    date_pr = (row.get('date_pr') or '').strip()
-                    date_gr = (row.get('date_gr') or '').strip()
-                    source = (row.get('source') or '').strip()
-                    price_str = (row.get('price_avg') or '').replace(',', '').strip()
-                    try:
-                        price = int(price_str)
-                    except Exception:
-                        continue
-                    # آرایه کامل
-                    full_rows.append({
-                        'date_pr': date_pr,
-                        'date_gr': date_gr,
-                        'source': source,
-                        'price_avg': price
-                    })
-                    # آرایه مینیمال
-                    iso = self.to_iso_date(date_gr)
-                    if iso:
-                        min_rows.append([iso, price])
-            # مرتب‌سازی بر اساس تاریخ
-            min_rows.sort(key=lambda x: x[0])
-            full_rows.sort(key=lambda item: (self.to_iso_date(item.get('date_gr', '')) or '9999-99-99'))
-            # نوشتن فایل‌ها
-            with open(min_path, 'w', encoding='utf-8') as fmin:
-                json.dump(min_rows, fmin, ensure_ascii=False, separators=(',', ':'))
-            with open(pretty_path, 'w', encoding='utf-8') as fpretty:
-                json.dump(full_rows, fpretty, ensure_ascii=False, indent=2)
+            stats = {'rows': 0}
+            result = self._write_outputs(self._iter_output_rows(stats), pretty_path, min_path, bin_path)
+            if result is None:
+                # CSV مرتب نیست: مرتب‌سازی پایدار بر اساس تاریخ (ردیف‌های بدون تاریخ در انتها)
+                stats = {'rows': 0}
+                rows = sorted(self._iter_output_rows(stats), key=lambda r: r[0] or '9999-99-99')
+                result = self._write_outputs(rows, pretty_path, min_path, bin_path)
+            output_count, min_count, last_iso = result
+            # ذخیره وضعیت برای به‌روزرسانی افزایشی در اجراهای بعدی
+            self._save_json_state(pretty_path, min_path, bin_path, stats['rows'], output_count,
+                                  last_iso, output_count - min_count)
+            if self.shards:
+                self.rebuild_shards()
             print("✅ فایل‌های JSON با موفقیت به‌روزرسانی شدند")
-            return True, row_count
+            return True, stats['rows']
         except Exception as e:
             print(f"⚠️ خطا در به‌روزرسانی JSON: {e}")
             return False, 0
+
+    # --- Incremental JSON ---
+    def _load_json_state(self):
+        """وضعیت ذخیره‌شده آخرین تولید JSON را می‌خواند (یا None)"""
+        try:
+            with open(self.json_state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            return state if state.get('version') == 1 else None
+        except (OSError, ValueError):
+            return None
+
+    def _save_json_state(self, pretty_path: str, min_path: str, bin_path: str, row_count: int,
+                         output_count: int, last_iso: str, undated: int) -> None:
+        """وضعیت فعلی CSV و خروجی‌های JSON را در فایل جانبی ذخیره می‌کند"""
+        try:
+            csv_size = os.path.getsize(self.csv_file_path)
+            state = {
+                'version': 1,
+                'csv_offset': csv_size,
+                'csv_sha256': file_sha256(self.csv_file_path, csv_size),
+                'row_count': row_count,
+                'output_count': output_count,
+                'undated_count': undated,
+                'last_iso': last_iso,
+                'pretty_path': pretty_path,
+                'pretty_size': os.path.getsize(pretty_path),
+                'min_path': min_path,
+                'min_size': os.path.getsize(min_path),
+                'bin_path': bin_path,
+                'bin_size': os.path.getsize(bin_path) if bin_path else 0,
+            }
+            tmp_path = f"{self.json_state_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.json_state_path)
+        except Exception as e:
+            print(f"⚠️ خطا در ذخیره وضعیت JSON: {e}")
+
+    def update_json_files(self, pretty_path: str = None, min_path: str = None,
+                          bin_path: str = None) -> tuple[bool, int]:
+        """به‌روزرسانی افزایشی خروجی‌های JSON: فقط ردیف‌های جدید انتهای CSV اضافه می‌شوند.
+        اگر CSV در جایی غیر از انتهای خود تغییر کرده باشد، بازسازی کامل انجام می‌شود.
+        برمی‌گرداند: (موفقیت, تعداد ردیف‌ها)
+        """
+        pretty_path, min_path, bin_path = self._output_paths(pretty_path, min_path, bin_path)
+        state = self._load_json_state()
+        if (not state or state['pretty_path'] != pretty_path or state['min_path'] != min_path
+                or state.get('bin_path') != bin_path):
+            return self.regenerate_json_files(pretty_path, min_path, bin_path)
+        try:
+            offset = state['csv_offset']
+            if (os.path.getsize(self.csv_file_path) < offset
+                    or os.path.getsize(pretty_path) != state['pretty_size']
+                    or os.path.getsize(min_path) != state['min_size']
+                    or (bin_path and (not is_price_store(bin_path) or os.path.getsize(bin_path) != state['bin_size']))
+                    or state['output_count'] == 0 or state['undated_count']):
+                return self.regenerate_json_files(pretty_path, min_path, bin_path)
+            with open(self.csv_file_path, 'rb') as f:
+                f.seek(offset - 1)
+                if f.read(1) != b'\n':
+                    return self.regenerate_json_files(pretty_path, min_path, bin_path)
+                tail = f.read()
+            if file_sha256(self.csv_file_path, offset) != state['csv_sha256']:
+                print("ℹ️ فایل CSV خارج از انتهای خود تغییر کرده است - بازسازی کامل JSON")
+                return self.regenerate_json_files(pretty_path, min_path, bin_path)
+            # ردیف‌هایی که بدون append_to_csv اضافه شده‌اند (مثلاً backfill) در بخش‌ها نیستند
+            if self.shards and not self.shards.is_current(self.store.row_count()):
+                self.rebuild_shards()
+            if not tail:
+                return True, state['row_count']
+
+            row_count = state['row_count']
+            full_rows = []
+            min_rows = []
+            dated = []
+            last_iso = state['last_iso']
+            fieldnames = ['date_pr', 'date_gr', 'source', 'price_avg']
+            for row in csv.DictReader(tail.decode('utf-8').splitlines(), fieldnames=fieldnames):
+                row_count += 1
+                output = self._output_row(row)
+                if output is None:
+                    continue
+                iso, item, price, source = output
+                if not iso and item is None:
+                    # قیمت اعشاری بدون تاریخ در هیچ خروجی نوشته نمی‌شود
+                    continue
+                # ردیف بدون تاریخ یا خارج از ترتیب نیازمند مرتب‌سازی مجدد کل فایل است
+                if not iso or iso < last_iso:
+                    return self.regenerate_json_files(pretty_path, min_path, bin_path)
+                last_iso = iso
+                if item is not None:
+                    full_rows.append(item)
+                    min_rows.append([iso, item['price_avg']])
+                dated.append((iso, price, source))
+
+            if bin_path and dated:
+                # افزودن رکوردهای طول ثابت به انتهای فایل باینری (پیش از JSON تا خطای آن چیزی را نیمه‌کاره نگذارد)
+                append_price_records(bin_path, self._price_records(dated))
+            # افزودن ردیف‌های جدید به انتهای آرایه‌ها بدون بازنویسی فایل‌ها
+            append_items(min_path, state['min_size'], min_rows)
+            append_items(pretty_path, state['pretty_size'], full_rows, pretty=True)
+            self._save_json_state(pretty_path, min_path, bin_path, row_count,
+                                  state['output_count'] + len(full_rows), last_iso, 0)
+            print(f"✅ {len(full_rows)} ردیف جدید به فایل‌های JSON اضافه شد")
+            return True, row_count
+        except Exception as e:
+            print(f"⚠️ خطا در به‌روزرسانی افزایشی JSON: {e} - بازسازی کامل")
+            return self.regenerate_json_files(pretty_path, min_path, bin_path)
     
+    def summary_lines(self, date_pr) -> list:
+        """ارقام خلاصه آماری برای README و متن انتشار: لیست (عنوان, مقدار)؛ بدون پیمایش کل تاریخچه"""
+        try:
+            stats = self.stats.load(self.csv_file_path)
+        except Exception as e:
+            print(f"⚠️ خطا در خواندن خلاصه آماری: {e}")
+            return []
+        lines = []
+        for label, point in (('بیشترین قیمت', stats.high), ('کمترین قیمت', stats.low)):
+            if point:
+                lines.append((label, f"{point['price']:,.0f} ریال ({point['date_pr']})"))
+        parsed = dates.parse_jalali(date_pr)
+        year = stats.year_summary(parsed[0]) if parsed else None
+        if year:
+            change = f"{year['change']:+,.0f} ریال"
+            if year['change_pct'] is not None:
+                change += f" ({year['change_pct']:+.1f}٪)"
+            lines.append((f"سال {parsed[0]}", f"شروع {year['open']:,.0f} | آخرین {year['close']:,.0f} | تغییر {change}"))
+        averages = stats.moving_averages()
+        if any(value is not None for value in averages.values()):
+            lines.append(("میانگین متحرک ۳۰ / ۹۰ / ۳۶۵ روزه",
+                          ' | '.join('-' if value is None else f"{value:,.0f}" for value in averages.values()) + " ریال"))
+        return lines
+
     def update_readme(self, latest_data, last_entry=None, csv_row_count=0):
         """فایل README را با آخرین اطلاعات به‌روزرسانی می‌کند (RTL + راست‌چین)"""
         try:
@@ -252,6 +499,14 @@ class USD2RialsUpdater:
             # اضافه کردن تعداد ردیف‌های CSV
             readme_content += f"  <p><strong>تعداد ردیف‌:</strong> {csv_row_count:,}</p>\n"
             
+            # خلاصه آماری از فایل کش (بدون خواندن کل CSV)
+            summary = self.summary_lines(latest_data['date_pr'])
+            if summary:
+                readme_content += "\n  <h2>📈 آمار</h2>\n  <ul>\n"
+                for label, value in summary:
+                    readme_content += f"    <li><strong>{label}:</strong> {value}</li>\n"
+                readme_content += "  </ul>\n"
+            
             readme_content += """
   <hr />
 
@@ -283,6 +538,11 @@ class USD2RialsUpdater:
 </div>
 """
             
+            # اگر محتوا تغییری نکرده باشد، فایل بازنویسی نمی‌شود
+            if os.path.exists('README.md'):
+                with open('README.md', 'r', encoding='utf-8') as f:
+                    if f.read() == readme_content:
+                        return True
             with open('README.md', 'w', encoding='utf-8') as f:
                 f.write(readme_content)
             
@@ -292,23 +552,15 @@ class USD2RialsUpdater:
             return False
     
     def is_first_day_of_persian_month(self, persian_date: str) -> bool:
-        """بررسی می‌کند که آیا تاریخ شمسی روز اول ماه است یا نه"""
+        """بررسی می‌کند که آیا تاریخ شمسی روز اول ماه است یا نه (ارقام فارسی یا انگلیسی)"""
         try:
-            # فرمت تاریخ شمسی معمولاً به صورت "۱۴۰۳/۰۶/۰۱" است
-            parts = persian_date.replace('/', ' ').replace('-', ' ').split()
-            if len(parts) >= 3:
-                day = parts[2].strip()
-                # تبدیل اعداد فارسی به انگلیسی
-                persian_to_english = str.maketrans('۰۱۲۳۴۵۶۷۸۹', '0123456789')
-                day_english = day.translate(persian_to_english)
-                return day_english == '01' or day_english == '1'
-            return False
+            return dates.is_first_day_of_month(persian_date)
         except Exception as e:
             print(f"خطا در بررسی روز اول ماه: {e}")
             return False
     
     def create_github_release(self, latest_data, csv_row_count: int) -> bool:
-        """ایجاد GitHub Release با فایل‌های CSV و JSON"""
+        """ایجاد GitHub Release با فایل‌های CSV و JSON، نسخه‌های فشرده آن‌ها و فایل تغییرات"""
         try:
             github_token = os.getenv('GITHUB_TOKEN')
             if not github_token:
@@ -320,11 +572,8 @@ class USD2RialsUpdater:
             persian_date = latest_data['date_pr']
             
             # تبدیل تاریخ میلادی به فرمت YYYYMMDD
-            try:
-                dt = datetime.strptime(gregorian_date, "%m/%d/%Y")
-                gregorian_formatted = dt.strftime("%Y%m%d")
-            except:
-                gregorian_formatted = gregorian_date.replace('/', '')
+            iso_date = dates.to_iso_date(gregorian_date)
+            gregorian_formatted = iso_date.replace('-', '') if iso_date else gregorian_date.replace('/', '')
             
             # تبدیل تاریخ شمسی به فرمت YYYYMMDD
             persian_formatted = persian_date.replace('/', '').replace('-', '')
@@ -334,21 +583,32 @@ class USD2RialsUpdater:
             
             release_body = f"""به‌روزرسانی شده تا {persian_date} - {gregorian_date}
 تعداد ردیف: {csv_row_count:,}"""
+            for label, value in self.summary_lines(persian_date):
+                release_body += f"\n{label}: {value}"
+            
+            # ساخت نسخه‌های پیش‌فشرده و فایل تغییرات نسبت به انتشار قبلی
+            assets = self.symbol.output_paths
+            release_state = ReleaseState(self.symbol.release_state_path)
+            with self.metrics.stage('release_artifacts') as stage:
+                assets += build_release_artifacts(self.csv_file_path, assets, release_state, tag=tag_name,
+                                                  delta_name=f"{self.symbol.prefix}.delta.json")
+                stage['bytes'] = sum(os.path.getsize(path) for path in assets if os.path.exists(path))
             
             # ایجاد release با GitHub CLI
             cmd = [
-                'gh', 'release', 'create', tag_name,
+                self.gh_command, 'release', 'create', tag_name,
                 '--title', release_name,
                 '--notes', release_body,
-                'USD2Rials.csv',
-                'USD2Rials.json',
-                'USD2Rials.min.json'
-            ]
+            ] + assets
             
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8')
+            with self.metrics.stage('gh_release') as stage:
+                result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8')
+                stage.update(ok=result.returncode == 0, exit_code=result.returncode)
             
             if result.returncode == 0:
                 print(f"✅ GitHub Release {tag_name} با موفقیت ایجاد شد")
+                # این انتشار پایه فایل تغییرات بعدی است
+                release_state.save(tag_name, self.csv_file_path, self.store.row_count())
                 return True
             else:
                 print(f"❌ خطا در ایجاد GitHub Release: {result.stderr}")
@@ -358,59 +618,72 @@ class USD2RialsUpdater:
             print(f"خطا در ایجاد GitHub Release: {e}")
             return False
     
+    def telegram_sink(self):
+        """مقصد تلگرام با Session مشترک یا None اگر توکن/شناسه تنظیم نشده باشد"""
+        bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
+        chat_id = os.getenv('TELEGRAM_CHAT_ID')
+        if not bot_token or not chat_id:
+            print("⚠️ TELEGRAM_BOT_TOKEN یا TELEGRAM_CHAT_ID تنظیم نشده است")
+            return None
+        return TelegramSink(bot_token, chat_id, [self.symbol.csv_path, self.symbol.json_path], session=self.session)
+
     def send_telegram_message(self, latest_data, csv_row_count: int) -> bool:
-        """ارسال پیام تلگرام با فایل‌های پروژه"""
+        """ارسال پیام تلگرام با فایل‌های فشرده پروژه در یک media group"""
         try:
-            bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
-            chat_id = os.getenv('TELEGRAM_CHAT_ID')
-            
-            if not bot_token or not chat_id:
-                print("⚠️ TELEGRAM_BOT_TOKEN یا TELEGRAM_CHAT_ID تنظیم نشده است")
-                return False
-            
-            message = f"""به‌روزرسانی تا {latest_data['date_pr']} - {latest_data['date_gr']}
-تعداد ردیف‌های CSV: {csv_row_count:,}"""
-            
-            # ارسال پیام متنی
-            url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-            data = {
-                'chat_id': chat_id,
-                'text': message
-            }
-            
-            response = requests.post(url, data=data)
-            if response.status_code != 200:
-                print(f"خطا در ارسال پیام تلگرام: {response.text}")
+            sink = self.telegram_sink()
+            if not sink:
                 return False
-            
-            # ارسال فایل CSV
-            url_doc = f"https://api.telegram.org/bot{bot_token}/sendDocument"
-            
-            files_to_send = ['USD2Rials.csv', 'USD2Rials.json']
-            
-            for file_path in files_to_send:
-                if os.path.exists(file_path):
-                    with open(file_path, 'rb') as file:
-                        files = {'document': file}
-                        data = {'chat_id': chat_id}
-                        response = requests.post(url_doc, data=data, files=files)
-                        
-                        if response.status_code == 200:
-                            print(f"✅ فایل {file_path} با موفقیت ارسال شد")
-                        else:
-                            print(f"❌ خطا در ارسال فایل {file_path}: {response.text}")
-                else:
-                    print(f"⚠️ فایل {file_path} یافت نشد")
-            
-            return True
-            
+            return sink(latest_data, csv_row_count)
         except Exception as e:
             print(f"خطا در ارسال پیام تلگرام: {e}")
             return False
-    
-    def run(self):
-        """اجرای فرآیند اصلی به‌روزرسانی"""
-        print("🔄 شروع فرآیند به‌روزرسانی قیمت دلار...")
+
+    def publish_update(self, latest_data, csv_row_count: int, release: bool = True) -> list:
+        """اجرای هم‌زمان مقصدهای انتشار (GitHub Release و در روز اول ماه شمسی تلگرام)"""
+        sinks = [GitHubReleaseSink(self)] if release else []
+        # بررسی روز اول ماه شمسی برای ارسال تلگرام
+        if self.is_first_day_of_persian_month(latest_data['date_pr']):
+            print("📅 روز اول ماه شمسی تشخیص داده شد - ارسال پیام تلگرام")
+            sink = self.telegram_sink()
+            if sink:
+                sinks.append(sink)
+        results = publish(sinks, latest_data, csv_row_count)
+        for sink, result in zip(sinks, results):
+            fields = {'bytes': sink.sent_bytes} if getattr(sink, 'sent_bytes', None) else {}
+            if result.error:
+                fields['error'] = result.error
+            self.metrics.record(f"publish_{result.name}", result.latency, result.ok, **fields)
+        return results
+
+    def update_json_files_timed(self) -> tuple[bool, int]:
+        """update_json_files با ثبت زمان، تعداد ردیف‌ها و اندازه خروجی‌ها در metrics"""
+        with self.metrics.stage('json') as stage:
+            success, row_count = self.update_json_files()
+            outputs = self.symbol.output_paths[1:]
+            stage.update(ok=success, rows=row_count,
+                         bytes=sum(os.path.getsize(path) for path in outputs if os.path.exists(path)))
+        return success, row_count
+
+    def update_readme_timed(self, latest_data, last_entry=None, csv_row_count=0) -> bool:
+        """update_readme با ثبت زمان در metrics"""
+        with self.metrics.stage('readme') as stage:
+            success = self.update_readme(latest_data, last_entry, csv_row_count)
+            stage.update(ok=success, bytes=os.path.getsize('README.md') if os.path.exists('README.md') else 0)
+        return success
+
+    def mark_fetch_processed(self, latest_data) -> None:
+        """ثبت پاسخ پردازش‌شده در کش HTTP تا اجرای بعدی در صورت عدم تغییر کاری انجام ندهد"""
+        if self.http_cache and self._last_response is not None:
+            try:
+                self.http_cache.mark_processed(self.url, self._last_response, latest_data)
+            except Exception as e:
+                print(f"⚠️ خطا در ذخیره کش HTTP: {e}")
+
+    def run(self, publish: bool = True):
+        """اجرای فرآیند اصلی به‌روزرسانی؛ با publish=False فقط داده‌ها (CSV و JSON) به‌روز می‌شوند
+        و README، GitHub Release و تلگرام اجرا نمی‌شوند.
+        """
+        print(f"🔄 شروع فرآیند به‌روزرسانی قیمت {self.symbol.name}...")
         
         # دریافت آخرین قیمت از وبسایت
         latest_data = self.fetch_latest_price()
@@ -420,6 +693,11 @@ class USD2RialsUpdater:
         
         print(f"📊 قیمت جدید دریافت شد: {latest_data['date_pr']} - {latest_data['price_avg']:,} ریال")
         
+        # پاسخ سایت (304 یا همان ردیف قبلی) قبلاً پردازش شده است: هیچ فایلی بازنویسی نمی‌شود
+        if self.fetch_unchanged:
+            print("ℹ️ اطلاعات سایت نسبت به اجرای قبلی تغییری نکرده است")
+            return True
+        
         # دریافت آخرین ردیف از فایل
         last_entry = self.get_last_entry()
         
@@ -427,27 +705,34 @@ class USD2RialsUpdater:
         is_new_data = self.is_new_data(latest_data, last_entry)
         
         if is_new_data:
-            # اضافه کردن به CSV
-            if self.append_to_csv(latest_data):
-                print("✅ داده جدید با موفقیت به فایل CSV اضافه شد")
-                
-                # تولید/به‌روزرسانی JSON ها و دریافت تعداد ردیف‌ها
-                json_success, csv_row_count = self.regenerate_json_files()
-                
-                # به‌روزرسانی README با تعداد ردیف‌ها
-                if self.update_readme(latest_data, last_entry, csv_row_count):
-                    print("✅ فایل README با موفقیت به‌روزرسانی شد")
+            # اضافه کردن به انتهای CSV یا درج در جای درست برای تاریخ‌های قدیمی‌تر
+            with self.metrics.stage('csv') as stage:
+                size_before = os.path.getsize(self.csv_file_path) if os.path.exists(self.csv_file_path) else 0
+                if self.is_after_last_entry(latest_data, last_entry):
+                    stage['mode'] = 'append'
+                    saved = self.append_to_csv(latest_data)
                 else:
-                    print("⚠️ خطا در به‌روزرسانی README")
+                    stage['mode'] = 'insert'
+                    saved = self.insert_into_csv(latest_data)
+                stage.update(ok=saved, rows=int(saved),
+                             bytes=os.path.getsize(self.csv_file_path) - size_before if saved else 0)
+            if saved:
+                print("✅ داده جدید با موفقیت به فایل CSV اضافه شد")
                 
-                # ایجاد GitHub Release برای داده‌های جدید
-                self.create_github_release(latest_data, csv_row_count)
+                # به‌روزرسانی افزایشی JSON ها و دریافت تعداد ردیف‌ها
+                json_success, csv_row_count = self.update_json_files_timed()
                 
-                # بررسی روز اول ماه شمسی برای ارسال تلگرام
-                if self.is_first_day_of_persian_month(latest_data['date_pr']):
-                    print("📅 روز اول ماه شمسی تشخیص داده شد - ارسال پیام تلگرام")
-                    self.send_telegram_message(latest_data, csv_row_count)
+                if publish:
+                    # به‌روزرسانی README با تعداد ردیف‌ها
+                    if self.update_readme_timed(latest_data, last_entry, csv_row_count):
+                        print("✅ فایل README با موفقیت به‌روزرسانی شد")
+                    else:
+                        print("⚠️ خطا در به‌روزرسانی README")
+                    
+                    # ایجاد GitHub Release و ارسال تلگرام به صورت هم‌زمان
+                    self.publish_update(latest_data, csv_row_count)
                 
+                self.mark_fetch_processed(latest_data)
                 return True
             else:
                 print("❌ خطا در اضافه کردن داده به فایل")
@@ -455,17 +740,165 @@ class USD2RialsUpdater:
         else:
             print("ℹ️ داده جدیدی برای اضافه کردن وجود ندارد")
             # حتی اگر داده جدید نباشد، README و JSONها را به‌روزرسانی کن
-            json_success, csv_row_count = self.regenerate_json_files()
-            self.update_readme(latest_data, last_entry, csv_row_count)
-            
-            # بررسی روز اول ماه شمسی برای ارسال تلگرام (حتی اگر داده جدید نباشد)
-            if self.is_first_day_of_persian_month(latest_data['date_pr']):
-                print("📅 روز اول ماه شمسی تشخیص داده شد - ارسال پیام تلگرام")
-                self.send_telegram_message(latest_data, csv_row_count)
+            # (در حالت افزایشی بدون ردیف جدید، فایل‌های JSON دست نمی‌خورند)
+            json_success, csv_row_count = self.update_json_files_timed()
+            if publish:
+                self.update_readme_timed(latest_data, last_entry, csv_row_count)
+                
+                # بررسی روز اول ماه شمسی برای ارسال تلگرام (حتی اگر داده جدید نباشد)
+                self.publish_update(latest_data, csv_row_count, release=False)
             
+            self.mark_fetch_processed(latest_data)
             return True
 
+def run_command(updater, args) -> bool:
+    """اجرای زیرفرمان انتخاب‌شده؛ برمی‌گرداند: موفقیت"""
+    if args.command == 'backfill':
+        from backfill import HistoryBackfiller
+        backfiller = HistoryBackfiller(updater, page_url_template=args.page_url_template,
+                                       max_workers=args.workers, retries=args.retries)
+        success = backfiller.run(max_pages=args.pages, since=args.since)
+    elif args.command == 'query':
+        try:
+            from query import PriceHistory, parse_query_date, run_query
+        except ImportError as e:
+            print(f"❌ زیرفرمان query به numpy نیاز دارد (pip install numpy): {e}")
+            return False
+        if args.source == 'csv':
+            history = PriceHistory.from_csv(updater.csv_file_path)
+        elif args.source == 'bin':
+            history = PriceHistory.from_store(updater.symbol.bin_path)
+        else:
+            history = PriceHistory.load(bin_path=updater.symbol.bin_path, csv_file_path=updater.csv_file_path)
+        result = run_query(
+            history, args.kind,
+            start=parse_query_date(args.start) if args.start else None,
+            end=parse_query_date(args.end) if args.end else None,
+            window=args.window, days=args.days,
+        )
+        print(json.dumps(result, ensure_ascii=False))
+        success = True
+    elif args.command == 'gaps':
+        index = updater.get_date_index()
+        weekend = [int(day) for day in args.weekend.split(',') if day.strip()]
+        gaps = index.gaps(weekend=weekend, since=args.since)
+        for start, end, days in gaps:
+            print(start if start == end else f"{start} - {end}", f"({days} روز)")
+        print(f"📅 {sum(days for _, _, days in gaps):,} روز کاری از دست رفته در {len(gaps):,} بازه "
+              f"بین {index.first_date()} و {index.last_date()}")
+        if index.duplicates:
+            print(f"⚠️ {len(index.duplicates):,} ردیف با تاریخ تکراری در CSV وجود دارد")
+        success = True
+    elif args.command == 'stats':
+        if args.rebuild:
+            updater.stats.rebuild(updater.csv_file_path)
+        if args.verify:
+            differences = updater.stats.verify(updater.csv_file_path)
+            for difference in differences:
+                print(f"❌ {difference}")
+            success = not differences
+            if success:
+                print("✅ خلاصه آماری با محاسبه کامل از روی CSV یکسان است")
+        else:
+            print(json.dumps(updater.stats.load(updater.csv_file_path).summary(), ensure_ascii=False))
+            success = True
+    else:
+        success = updater.run()
+    return success
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="به‌روزرسانی آرشیو قیمت دلار به ریال")
+    parser.add_argument('--parser', choices=PARSERS, default='auto',
+                        help="روش تجزیه صفحه tgju (پیش‌فرض auto: lxml با بازگشت به html.parser)")
+    parser.add_argument('--no-cache', action='store_true', help="غیرفعال کردن کش HTTP و درخواست شرطی")
+    parser.add_argument('--gh-command', default=os.getenv('GH_COMMAND', 'gh'),
+                        help="دستور GitHub CLI (برای اجرای آزمایشی با یک جایگزین محلی)")
+    parser.add_argument('--symbols', default=os.getenv('SYMBOLS', PRIMARY_SYMBOL),
+                        help=f"نمادها جدا شده با کاما یا all ({', '.join(SYMBOLS)}؛ پیش‌فرض {PRIMARY_SYMBOL})")
+    parser.add_argument('--symbol-workers', type=int, default=4,
+                        help="حداکثر تعداد نمادهایی که هم‌زمان به‌روزرسانی می‌شوند")
+    parser.add_argument('--daemon', action='store_true',
+                        help="اجرای دائمی با دریافت تطبیقی در ساعات بازار تهران و نهایی کردن ردیف روزانه پس از بسته شدن بازار")
+    parser.add_argument('--market-open', default='09:00', help="ساعت باز شدن بازار به وقت تهران (حالت daemon)")
+    parser.add_argument('--market-close', default='17:00', help="ساعت بسته شدن بازار به وقت تهران (حالت daemon)")
+    parser.add_argument('--poll-min', type=float, default=60, help="کمترین فاصله دریافت در ساعات بازار (ثانیه)")
+    parser.add_argument('--poll-max', type=float, default=900, help="بیشترین فاصله دریافت هنگام ثابت ماندن قیمت (ثانیه)")
+    parser.add_argument('--snapshot-file', help="فایل قیمت‌های درون‌روزی (پیش‌فرض <prefix>.intraday.csv)")
+    parser.add_argument('--max-polls', type=int, help="توقف daemon پس از این تعداد نوبت (برای آزمایش)")
+    parser.add_argument('--metrics-log', default=os.getenv('METRICS_LOG'),
+                        help="مسیر لاگ JSON مراحل (هر خط یک رویداد؛ '-' برای stderr)")
+    parser.add_argument('--metrics-file', default=os.getenv('METRICS_FILE'),
+                        help="مسیر فایل metrics با قالب متنی Prometheus (textfile collector)")
+    parser.add_argument('--shard-dir', default=os.getenv('SHARD_DIR'),
+                        help="پوشه فایل‌های سالانه شمسی (مثلاً shards/1404.csv) و manifest.json")
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('update', help="دریافت آخرین قیمت و به‌روزرسانی فایل‌ها (پیش‌فرض)")
+    backfill_parser = subparsers.add_parser('backfill', help="بازیابی روزهای از دست رفته از صفحات تاریخچه")
+    backfill_parser.add_argument('--pages', type=int, default=10, help="حداکثر تعداد صفحات")
+    backfill_parser.add_argument('--since', help="تاریخ شمسی شروع (مثلاً 1404/07/01)")
+    backfill_parser.add_argument('--workers', type=int, default=4, help="تعداد اتصال‌های هم‌زمان")
+    backfill_parser.add_argument('--retries', type=int, default=3, help="تعداد تلاش مجدد برای هر صفحه")
+    backfill_parser.add_argument('--page-url-template', help="الگوی آدرس صفحات با {page}")
+    gaps_parser = subparsers.add_parser('gaps', help="فهرست روزهای کاری از دست رفته در CSV")
+    gaps_parser.add_argument('--since', help="تاریخ شمسی شروع (مثلاً 1400/01/01)")
+    gaps_parser.add_argument('--weekend', default='4',
+                             help="روزهای تعطیل هفته با شماره weekday پایتون، جدا شده با کاما (پیش‌فرض 4 = جمعه؛ خالی برای هیچ)")
+    query_parser = subparsers.add_parser('query', help="پرس‌وجوی تحلیلی روی تاریخچه (نیازمند numpy)")
+    query_parser.add_argument('kind', choices=['range', 'weekly', 'monthly', 'rolling', 'change'],
+                              help="range: بازه، weekly/monthly: OHLC هفتگی/ماه شمسی، rolling: میانگین و نوسان متحرک، change: درصد تغییر")
+    query_parser.add_argument('--start', help="تاریخ شروع (ISO میلادی یا شمسی)")
+    query_parser.add_argument('--end', help="تاریخ پایان (ISO میلادی یا شمسی)")
+    query_parser.add_argument('--window', type=int, default=30, help="طول پنجره متحرک (تعداد ردیف)")
+    query_parser.add_argument('--days', type=int, default=30, help="فاصله روزهای تقویمی برای درصد تغییر")
+    query_parser.add_argument('--source', choices=['auto', 'bin', 'csv'], default='auto',
+                              help="منبع داده: فایل باینری، CSV یا خودکار (باینری در صورت وجود)")
+    stats_parser = subparsers.add_parser('stats', help="خلاصه آماری (بیشترین/کمترین، تغییر سالانه، میانگین متحرک)")
+    stats_parser.add_argument('--rebuild', action='store_true', help="محاسبه دوباره خلاصه از روی کل CSV")
+    stats_parser.add_argument('--verify', action='store_true', help="مقایسه خلاصه ذخیره‌شده با محاسبه کامل")
+    args = parser.parse_args(argv)
+
+    try:
+        symbols = get_symbols(args.symbols)
+    except ValueError as e:
+        parser.error(str(e))
+    if len(symbols) > 1 and args.command not in (None, 'update'):
+        parser.error(f"زیرفرمان {args.command} فقط برای یک نماد قابل اجراست")
+    if args.daemon and (len(symbols) > 1 or args.command not in (None, 'update')):
+        parser.error("حالت daemon فقط برای به‌روزرسانی یک نماد قابل اجراست")
+
+    metrics = Metrics(args.metrics_log, args.metrics_file)
+    http_cache_dir = None if args.no_cache else ".cache/http"
+    # پروفایل اختیاری با متغیر محیطی UPDATER_PROFILE (cprofile / tracemalloc)
+    with profiling(metrics=metrics):
+        if len(symbols) > 1:
+            from tracker import MultiSymbolTracker
+            tracker = MultiSymbolTracker(symbols, max_workers=args.symbol_workers, parser=args.parser,
+                                         http_cache_dir=http_cache_dir, gh_command=args.gh_command,
+                                         shard_dir=args.shard_dir, metrics=metrics)
+            # خطای یک نماد مانع اجرای بقیه نمی‌شود (و گزارش می‌شود)، اما وضعیت خروج تابع نماد اصلی است؛
+            # اگر نماد اصلی انتخاب نشده باشد همه نمادها باید موفق باشند
+            results = tracker.run()
+            primary = [result for result in results if result.key == PRIMARY_SYMBOL]
+            success = all(result.ok for result in primary or results)
+        else:
+            updater = USD2RialsUpdater(parser=args.parser, http_cache_dir=http_cache_dir,
+                                       gh_command=args.gh_command, shard_dir=args.shard_dir,
+                                       metrics=metrics, symbol=symbols[0])
+            if args.daemon:
+                from daemon import AdaptivePoller, MarketHours, PollingDaemon, parse_clock
+                daemon = PollingDaemon(
+                    updater,
+                    market=MarketHours(parse_clock(args.market_open), parse_clock(args.market_close)),
+                    poller=AdaptivePoller(args.poll_min, args.poll_max),
+                    snapshot_path=args.snapshot_file, metrics=metrics, max_polls=args.max_polls,
+                )
+                success = daemon.run()
+            else:
+                success = run_command(updater, args)
+    metrics.finish(success, command=args.command or 'update')
+    return 0 if success else 1
+
+
 if __name__ == "__main__":
-    updater = USD2RialsUpdater()
-    success = updater.run()
-    exit(0 if success else 1)
+    exit(main())